@@ -2,7 +2,8 @@
 """
 Advanced Agent with Multi-step Planning and Self-Correction
 """
-from typing import List, Dict,Any
+import asyncio
+from typing import List, Dict, Any, AsyncIterator
 from ollama_actual import OllamaLLM
 from memory import LongTermMemory
 from policy import PolicyEngine, PolicyDecision
@@ -157,8 +158,8 @@ class TerminalAgent:
         return args
     
 
-    async def answer(self, question: str) -> str:
-        """Main entry point with advanced capabilities"""
+    async def _prepare_answer(self, question: str) -> Dict[str, Any]:
+        """Run steps 1-5 and build the prompt for the final answer"""
         
         if self.debug_mode:
             print("\n" + "=" * 60)
@@ -211,21 +212,21 @@ class TerminalAgent:
         if self.debug_mode:
             print("\n[2/7] Creating task plan...")
         
-        task_plan = self.planner.decompose_task(question, context_info)
+        task_plan = self.planner.decompose_task(question, context_info, validate=False)
         
         if self.debug_mode:
             print(f"   ✓ Generated {len(task_plan.subtasks)} subtasks")
             for task in task_plan.subtasks:
                 print(f"      - {task.id}: {task.description}")
         
-        graph.add_node("plan", task_plan.to_dict())
-        
-# Validation is already done in planner.decompose_task()
-# Just check if there are validation errors
-        if task_plan.validation_errors:
+        # Validation is lazy - is_valid runs it once and fills validation_errors
+        if not task_plan.is_valid:
             print(f"⚠️  Plan validation failed:")
             for error in task_plan.validation_errors:
-                print(f"   - {error}")        
+                print(f"   - {error}")
+        
+        graph.add_node("plan", task_plan.to_dict())
+        
         # ============================================================
         # STEP 3: Detect Tool Chains
         # ============================================================
@@ -339,21 +340,25 @@ class TerminalAgent:
 
         Your response (natural language only):
         """
-        final_answer = self.llm.generate(final_prompt)
-        
-        # ============================================================
-        # STEP 7: Save to Memory
-        # ============================================================
+        return {
+            "final_prompt": final_prompt,
+            "task_plan": task_plan,
+            "execution_results": execution_results,
+            "graph": graph
+        }
+    
+    def _save_answer(self, question: str, prepared: Dict[str, Any], final_answer: str) -> None:
+        """Step 7: persist the turn to memory and checkpoint the session"""
         if self.debug_mode:
             print("\n[7/7] Saving to memory...")
         
         self.memory.store(
             {
                 "question": question,
-                "plan": task_plan.to_dict(),
-                "execution_results": execution_results,
+                "plan": prepared["task_plan"].to_dict(),
+                "execution_results": prepared["execution_results"],
                 "answer": final_answer,
-                "execution_graph": graph.snapshot(),
+                "execution_graph": prepared["graph"].snapshot(),
                 "self_correction_summary": self.self_correcting_agent.get_execution_summary()
             },
             source="advanced_terminal_agent"
@@ -367,7 +372,27 @@ class TerminalAgent:
             print("\n" + "=" * 60)
             print("✓ COMPLETE")
             print("=" * 60)
-        
+    
+    async def answer(self, question: str) -> str:
+        """Main entry point with advanced capabilities"""
+        prepared = await self._prepare_answer(question)
+        final_answer = self.llm.generate(prepared["final_prompt"])
+        self._save_answer(question, prepared, final_answer)
         return final_answer
     
-
+    async def answer_stream(self, question: str) -> AsyncIterator[str]:
+        """Like answer(), but yields the final response as the LLM produces it"""
+        prepared = await self._prepare_answer(question)
+        
+        # Pull chunks off the blocking LLM stream in a worker thread
+        loop = asyncio.get_running_loop()
+        chunks = self.llm.generate_stream(prepared["final_prompt"])
+        parts = []
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                break
+            parts.append(chunk)
+            yield chunk
+        
+        self._save_answer(question, prepared, "".join(parts))
@@ -78,6 +78,8 @@ class MCPAppClient:
         self._resources = []
         self._tools = []
         self._prompts = []
+        # Bumped on every capability (re)load so callers can cache listings
+        self._capabilities_rev = 0
 
         # Runtime state
         self._context_buffer = []
@@ -145,6 +147,7 @@ class MCPAppClient:
         self._resources = await self._client.list_resources()
         self._tools = await self._client.list_tools()
         self._prompts = await self._client.list_prompts()
+        self._capabilities_rev += 1
 
         self._trace(
             "capabilities_loaded",
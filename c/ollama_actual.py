@@ -37,6 +37,8 @@ CRITICAL RULES:
 """
 
 
+from typing import Iterator
+
 import ollama
 from config import OLLAMA_MODEL, OLLAMA_TIMEOUT_SECONDS
 
@@ -91,6 +93,45 @@ def run_llm(prompt: str, model: str = None) -> str:
         raise RuntimeError(f"Ollama execution failed: {e}")
 
 
+def run_llm_stream(prompt: str, model: str = None) -> Iterator[str]:
+    """
+    Streaming variant of run_llm().
+
+    Yields response text chunks as Ollama produces them.
+    """
+    model_to_use = model or OLLAMA_MODEL
+
+    try:
+        print(f"\n🧠 Streaming Ollama model: {model_to_use}")
+        print(f"   Prompt length: {len(prompt)} chars")
+
+        stream = ollama.chat(
+            model=model_to_use,
+            messages=[
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            options={
+                "timeout": OLLAMA_TIMEOUT_SECONDS
+            },
+            stream=True
+        )
+
+        for part in stream:
+            text = part["message"]["content"]
+            if text:
+                yield text
+
+    except Exception as e:
+        raise RuntimeError(f"Ollama execution failed: {e}")
+
+
 # ============================================================
 # CLASS WRAPPER
 # Used by agent.py:
@@ -111,4 +152,8 @@ class OllamaLLM:
 
     def generate(self, prompt: str) -> str:
         """Run the prompt through the local LLM and return the text."""
-        return run_llm(prompt, self.model)
\ No newline at end of file
+        return run_llm(prompt, self.model)
+
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """Run the prompt through the local LLM, yielding text chunks."""
+        return run_llm_stream(prompt, self.model)
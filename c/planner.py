@@ -4,11 +4,20 @@ Hierarchical Task Planner with Validation and Rollback
 """
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import List, Dict, Any, Optional
 from enum import Enum
 import json
 import re
 
+# Import json_repair with error handling
+try:
+    import json_repair
+    JSON_REPAIR_AVAILABLE = True
+except ImportError:
+    JSON_REPAIR_AVAILABLE = False
+    json_repair = None
+
 
 
 def fix_common_json_errors(json_str: str) -> str:
@@ -37,6 +46,24 @@ def fix_common_json_errors(json_str: str) -> str:
     return json_str.strip()
 
 
+def robust_json_loads(json_str: str) -> Any:
+    """Parse LLM JSON output, escalating from cheap fixes to json_repair"""
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        pass
+    
+    fixed = fix_common_json_errors(json_str)
+    try:
+        return json.loads(fixed)
+    except json.JSONDecodeError:
+        if not JSON_REPAIR_AVAILABLE:
+            raise
+    
+    # Only pay for json_repair on true failures
+    return json_repair.loads(fixed)
+
+
 
 class TaskStatus(Enum):
     PENDING = "pending"
@@ -67,6 +94,18 @@ class TaskPlan:
     subtasks: List[SubTask] = field(default_factory=list)
     execution_order: List[str] = field(default_factory=list)
     validation_errors: List[str] = field(default_factory=list)
+    _valid_tools_ref: Optional[set] = field(default=None, repr=False, compare=False)
+    
+    @cached_property
+    def is_valid(self) -> bool:
+        """Lazily validate against the tool set recorded by the planner.
+        
+        Computed once on first access; populates validation_errors.
+        """
+        valid_tools = self._valid_tools_ref
+        if valid_tools is None:
+            valid_tools = get_valid_tools_from_client()
+        return self.validate_with_tools(valid_tools)
     
     def add_subtask(self, subtask: SubTask) -> None:
         """Add a subtask to the plan"""
@@ -274,8 +313,13 @@ class HierarchicalPlanner:
             lines.append(f"- {tool_name}({args_str}) - {schema['description']}")
         
         return "\n".join(lines)    
-    def decompose_task(self, goal: str, context: Dict[str, Any]) -> TaskPlan:
-        """Break down a complex goal into subtasks using LLM"""
+    def decompose_task(self, goal: str, context: Dict[str, Any], validate: bool = True) -> TaskPlan:
+        """Break down a complex goal into subtasks using LLM
+        
+        With validate=False the plan is not validated here; callers check
+        plan.is_valid, which validates on first access and fills
+        plan.validation_errors. validate=True keeps the old eager behaviour.
+        """
         
         valid_tools = get_valid_tools_from_client(self.mcp_client)
         tool_schemas = self._build_tool_schemas()
@@ -340,9 +384,6 @@ class HierarchicalPlanner:
         try:
             response = self.llm.generate(prompt)
             
-            # IMPROVED: Strip markdown code blocks first
-            
-            
             # Remove ```json and ``` markers
             cleaned = response.strip()
             cleaned = re.sub(r'^```json\s*', '', cleaned)
@@ -351,21 +392,13 @@ class HierarchicalPlanner:
             
             # Try to find JSON object
             json_match = re.search(r'\{.*\}', cleaned, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                
-                # IMPROVED: Fix common JSON errors
-                # Fix trailing commas before closing braces/brackets
-                json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
-                # Fix double closing braces
-                json_str = re.sub(r'}\s*}', r'}', json_str)
-                
-                data = json.loads(json_str)
-            else:
-                # Try parsing the cleaned response directly
-                data = json.loads(cleaned)
+            json_str = json_match.group() if json_match else cleaned
             
-            plan = TaskPlan(goal=goal)
+            data = robust_json_loads(json_str)
+            if not isinstance(data, dict):
+                raise ValueError(f"Expected JSON object, got {type(data).__name__}")
+            
+            plan = TaskPlan(goal=goal, _valid_tools_ref=valid_tools)
             
             for task_data in data.get("subtasks", []):
                 subtask = SubTask(
@@ -379,7 +412,10 @@ class HierarchicalPlanner:
                 plan.add_subtask(subtask)
             
             plan.compute_execution_order()
-            plan.validate_with_tools(valid_tools)
+            if validate:
+                # Eager mode: run the cached check now so validation_errors
+                # is filled before the plan is returned
+                _ = plan.is_valid
             
             return plan
             
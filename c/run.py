@@ -28,156 +28,259 @@ Any other input is treated as a tool-aware query.
 """
 
 import asyncio
+import heapq
+import json
 import sys
 import os
-from typing import Optional
+import time
+import traceback
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+# Import orjson with error handling (faster decode of resource payloads)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
 
 from client import MCPAppClient
 from agent import TerminalAgent
 from config import AGENT_DEBUG_MODE
 
 
+# =========================================================
+# STATIC DISPLAY DATA (built once at import)
+# =========================================================
+
+_BANNER = "=" * 60
+
+# Short-lived resource cache: repeated dashboard commands reuse recent reads
+_RESOURCE_CACHE_MAX = 32
+_MONITOR_TTL = 2.0
+_METRICS_TTL = 5.0
+
+_EXIT_CMDS = frozenset({"exit", "quit"})
+_SHORT_CMDS = frozenset({
+    "exit", "quit", "help", "tools", "resources", "metrics",
+    "cache", "review", "docs", "search", "monitor", "chat"
+})
+# Longer input can't be a command, so it skips .lower() entirely
+_MAX_CMD_LEN = max(len(c) for c in _SHORT_CMDS)
+
+_METRICS_HEADER = f"\n{'Tool':<30} {'Calls':<8} {'Success':<8} {'Avg (ms)':<10}\n" + "-" * 60
+
+# Tools grouped by phase
+_PHASES = {
+    "Core Terminal": [
+        "run_command", "interactive_command", "read_file", "write_file",
+        "list_directory", "search_files", "replace_in_file", "list_processes",
+        "kill_process", "get_env", "system_info", "git_status", "git_diff",
+        "git_commit", "tail_file", "check_port", "docker_ps"
+    ],
+    "Code Analysis (Phase 2)": [
+        "analyze_code_quality", "detect_security_issues", "profile_code_performance",
+        "analyze_project_structure", "detect_circular_dependencies", 
+        "generate_dependency_graph", "trace_execution", "analyze_error_logs",
+        "compare_outputs", "generate_unit_tests", "run_tests_with_coverage",
+        "detect_test_gaps"
+    ],
+    "Debugging (Phase 3)": [
+        "trace_error_origin", "find_breaking_change", "refactor_function_name",
+        "inspect_running_process", "detect_memory_leaks"
+    ],
+    "Production (Phase 5)": [
+        "undo_last_action", "run_command_sandboxed", "backup_before_operation",
+        "clear_cache"
+    ],
+    "AI-Powered (Phase 7)": [
+        "ai_code_review", "generate_docs", "semantic_code_search"
+    ]
+}
+
+_RESOURCE_GROUPS = {
+    "Workspace": ["workspace://tree", "workspace://summary"],
+    "System": ["system://info", "system://env", "system://disk", "system://processes"],
+    "Git": ["git://status", "git://diff", "git://log"],
+    "Session": ["session://cwd", "session://tasks"],
+    "Project Intelligence (Phase 4)": [
+        "project://complexity", "project://dependencies", "project://test-coverage"
+    ],
+    "Monitoring (Phase 4)": [
+        "monitor://cpu", "monitor://memory", "monitor://file-changes", "monitor://disk"
+    ],
+    "Metrics (Phase 5)": [
+        "metrics://tool-performance", "cache://stats"
+    ]
+}
+
+_HELP_TEXT = """
+📋 Information:
+  tools      - List all available tools
+  resources  - List all available resources
+  help       - Show this help message
+
+📊 Monitoring:
+  metrics    - Show tool performance metrics
+  cache      - Show cache statistics
+  monitor    - System monitoring dashboard
+
+🤖 AI Features:
+  review     - AI code review on a file
+  docs       - Generate project documentation
+  search     - Semantic code search
+
+💬 Interaction:
+  chat       - Interactive chat mode
+  exit/quit  - Exit the application
+
+📝 Direct Commands:
+  Any other input is treated as a natural language query
+  and will be processed by the AI agent with full tool access.
+
+Examples:
+  > analyze the code quality of app.py
+  > find all functions without error handling
+  > show me system resource usage
+  > create a backup of config.py
+  > review src/main.py for security issues
+"""
+
+
+async def ainput(prompt: str = "") -> str:
+    """Read a line from stdin without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, input, prompt)
+
+
+async def stream_answer(agent: TerminalAgent, question: str) -> None:
+    """Write the agent's answer to stdout chunk by chunk as it is generated"""
+    async for chunk in agent.answer_stream(question):
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+    sys.stdout.write("\n\n")
+
+
+def _decode_resource(result):
+    """Decode the JSON payload of an MCP resource response, or None if unusable"""
+    try:
+        return _json_loads(result[0].contents)
+    except (IndexError, TypeError, AttributeError, ValueError):
+        return None
+
+
 class EnhancedTerminalClient:
     """Enhanced terminal client with all Phase 1-7 features"""
     
     def __init__(self, mcp_client: MCPAppClient, agent: TerminalAgent):
         self.client = mcp_client
         self.agent = agent
+        self._resource_cache: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        
+        # Capabilities are discovered once on connect, so freeze lookups up front
+        self._tool_names = frozenset(getattr(t, "name", t) for t in mcp_client._tools)
+        self._resource_uris = frozenset(str(getattr(r, "uri", r)) for r in mcp_client._resources)
+    
+    async def _cached_read(self, server: str, uri: str, ttl: float = _MONITOR_TTL):
+        """Read a resource, reusing a result younger than ttl seconds (LRU-bounded)"""
+        key = (server, uri)
+        entry = self._resource_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            self._resource_cache.move_to_end(key)
+            return entry[1]
+        
+        result = await self.client.read_resource(server, uri)
+        self._resource_cache[key] = (time.monotonic(), result)
+        self._resource_cache.move_to_end(key)
+        if len(self._resource_cache) > _RESOURCE_CACHE_MAX:
+            self._resource_cache.popitem(last=False)
+        return result
     
     async def show_tools(self):
         """Display all available tools grouped by phase"""
-        print("\n" + "=" * 60)
-        print("AVAILABLE TOOLS")
-        print("=" * 60)
+        lines = ["", _BANNER, "AVAILABLE TOOLS", _BANNER]
         
-        # Group tools by phase
-        phases = {
-            "Core Terminal": [
-                "run_command", "interactive_command", "read_file", "write_file",
-                "list_directory", "search_files", "replace_in_file", "list_processes",
-                "kill_process", "get_env", "system_info", "git_status", "git_diff",
-                "git_commit", "tail_file", "check_port", "docker_ps"
-            ],
-            "Code Analysis (Phase 2)": [
-                "analyze_code_quality", "detect_security_issues", "profile_code_performance",
-                "analyze_project_structure", "detect_circular_dependencies", 
-                "generate_dependency_graph", "trace_execution", "analyze_error_logs",
-                "compare_outputs", "generate_unit_tests", "run_tests_with_coverage",
-                "detect_test_gaps"
-            ],
-            "Debugging (Phase 3)": [
-                "trace_error_origin", "find_breaking_change", "refactor_function_name",
-                "inspect_running_process", "detect_memory_leaks"
-            ],
-            "Production (Phase 5)": [
-                "undo_last_action", "run_command_sandboxed", "backup_before_operation",
-                "clear_cache"
-            ],
-            "AI-Powered (Phase 7)": [
-                "ai_code_review", "generate_docs", "semantic_code_search"
-            ]
-        }
+        tool_set = self._tool_names
         
         total_tools = 0
-        for phase_name, tools in phases.items():
-            print(f"\n{phase_name}:")
-            available = [t for t in tools if t in self.client._tools]
+        for phase_name, tools in _PHASES.items():
+            lines.append(f"\n{phase_name}:")
+            available, missing = [], []
+            for t in tools:
+                (available if t in tool_set else missing).append(t)
             total_tools += len(available)
             
-            for tool in available:
-                print(f"  ✓ {tool}")
-            
-            missing = [t for t in tools if t not in self.client._tools]
-            for tool in missing:
-                print(f"  ✗ {tool} (not registered)")
+            lines.extend(f"  ✓ {tool}" for tool in available)
+            lines.extend(f"  ✗ {tool} (not registered)" for tool in missing)
         
-        print(f"\n{'=' * 60}")
-        print(f"Total Available: {total_tools} tools")
-        print("=" * 60 + "\n")
+        lines.append(f"\n{_BANNER}")
+        lines.append(f"Total Available: {total_tools} tools")
+        lines.append(_BANNER + "\n")
+        
+        # One write per command instead of one print per tool
+        sys.stdout.write("\n".join(lines) + "\n")
     
     async def show_resources(self):
         """Display all available resources"""
-        print("\n" + "=" * 60)
-        print("AVAILABLE RESOURCES")
-        print("=" * 60)
+        lines = ["", _BANNER, "AVAILABLE RESOURCES", _BANNER]
         
-        resources = {
-            "Workspace": ["workspace://tree", "workspace://summary"],
-            "System": ["system://info", "system://env", "system://disk", "system://processes"],
-            "Git": ["git://status", "git://diff", "git://log"],
-            "Session": ["session://cwd", "session://tasks"],
-            "Project Intelligence (Phase 4)": [
-                "project://complexity", "project://dependencies", "project://test-coverage"
-            ],
-            "Monitoring (Phase 4)": [
-                "monitor://cpu", "monitor://memory", "monitor://file-changes", "monitor://disk"
-            ],
-            "Metrics (Phase 5)": [
-                "metrics://tool-performance", "cache://stats"
-            ]
-        }
+        resource_set = self._resource_uris
         
         total_resources = 0
-        for category, res_list in resources.items():
-            print(f"\n{category}:")
+        for category, res_list in _RESOURCE_GROUPS.items():
+            lines.append(f"\n{category}:")
             for res in res_list:
-                if res in self.client._resources:
-                    print(f"  ✓ {res}")
+                if res in resource_set:
+                    lines.append(f"  ✓ {res}")
                     total_resources += 1
                 else:
-                    print(f"  ✗ {res} (not registered)")
+                    lines.append(f"  ✗ {res} (not registered)")
         
-        print(f"\n{'=' * 60}")
-        print(f"Total Available: {total_resources} resources")
-        print("=" * 60 + "\n")
+        lines.append(f"\n{_BANNER}")
+        lines.append(f"Total Available: {total_resources} resources")
+        lines.append(_BANNER + "\n")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
     async def show_metrics(self):
         """Show tool performance metrics"""
         print("\n🔍 Fetching tool performance metrics...\n")
         
         try:
-            result = await self.client.read_resource("terminal", "metrics://tool-performance")
+            result = await self._cached_read("terminal", "metrics://tool-performance", ttl=_METRICS_TTL)
             
-            # Extract metrics
-            if hasattr(result, '__iter__') and len(result) > 0:
-                first_item = result[0]
-                if hasattr(first_item, 'contents'):
-                    import json
-                    metrics_data = json.loads(first_item.contents)
-                    
-                    print("=" * 60)
-                    print("TOOL PERFORMANCE METRICS")
-                    print("=" * 60)
-                    
-                    if "metrics" in metrics_data:
-                        metrics = metrics_data["metrics"]
-                        
-                        if not metrics:
-                            print("\nNo metrics available yet. Use some tools first!\n")
-                            return
-                        
-                        # Sort by total calls
-                        sorted_tools = sorted(
-                            metrics.items(), 
-                            key=lambda x: x[1].get("total_calls", 0), 
-                            reverse=True
-                        )
-                        
-                        print(f"\n{'Tool':<30} {'Calls':<8} {'Success':<8} {'Avg (ms)':<10}")
-                        print("-" * 60)
-                        
-                        for tool_name, data in sorted_tools[:20]:  # Top 20
-                            calls = data.get("total_calls", 0)
-                            success_rate = data.get("success_rate", 0)
-                            avg_duration = data.get("avg_duration_ms", 0)
-                            
-                            print(f"{tool_name:<30} {calls:<8} {success_rate:<7.1f}% {avg_duration:<10.2f}")
-                        
-                        print("\n" + "=" * 60 + "\n")
-                    else:
-                        print("No metrics data found.\n")
-            else:
+            metrics_data = _decode_resource(result)
+            if metrics_data is None:
                 print("Could not retrieve metrics.\n")
+                return
+            
+            print(_BANNER)
+            print("TOOL PERFORMANCE METRICS")
+            print(_BANNER)
+            
+            if "metrics" in metrics_data:
+                metrics = metrics_data["metrics"]
+                
+                if not metrics:
+                    print("\nNo metrics available yet. Use some tools first!\n")
+                    return
+                
+                # Top 20 by total calls - O(n log k) instead of a full sort
+                top_tools = heapq.nlargest(
+                    20,
+                    metrics.items(),
+                    key=lambda x: x[1].get("total_calls", 0)
+                )
+                
+                rows = "\n".join(
+                    f"{name:<30} {d.get('total_calls', 0):<8} "
+                    f"{d.get('success_rate', 0):<7.1f}% {d.get('avg_duration_ms', 0):<10.2f}"
+                    for name, d in top_tools
+                )
+                sys.stdout.write(f"{_METRICS_HEADER}\n{rows}\n\n{_BANNER}\n\n")
+            else:
+                print("No metrics data found.\n")
         
         except Exception as e:
             print(f"Error fetching metrics: {e}\n")
@@ -187,32 +290,31 @@ class EnhancedTerminalClient:
         print("\n🔍 Fetching cache statistics...\n")
         
         try:
-            result = await self.client.read_resource("terminal", "cache://stats")
+            result = await self._cached_read("terminal", "cache://stats")
+            
+            cache_data = _decode_resource(result)
+            if cache_data is None:
+                print("Could not retrieve cache statistics.\n")
+                return
             
-            if hasattr(result, '__iter__') and len(result) > 0:
-                first_item = result[0]
-                if hasattr(first_item, 'contents'):
-                    import json
-                    cache_data = json.loads(first_item.contents)
-                    
-                    print("=" * 60)
-                    print("CACHE STATISTICS")
-                    print("=" * 60)
-                    print(f"\nSize: {cache_data.get('size', 0)} / {cache_data.get('max_size', 0)} entries")
-                    print(f"Memory: {cache_data.get('memory_mb', 0)} MB")
-                    print(f"Utilization: {cache_data.get('utilization', 0)}%")
-                    print("\n" + "=" * 60 + "\n")
+            print(_BANNER)
+            print("CACHE STATISTICS")
+            print(_BANNER)
+            print(f"\nSize: {cache_data.get('size', 0)} / {cache_data.get('max_size', 0)} entries")
+            print(f"Memory: {cache_data.get('memory_mb', 0)} MB")
+            print(f"Utilization: {cache_data.get('utilization', 0)}%")
+            print("\n" + _BANNER + "\n")
         
         except Exception as e:
             print(f"Error fetching cache stats: {e}\n")
     
     async def ai_code_review_interactive(self):
         """Interactive AI code review"""
-        print("\n" + "=" * 60)
+        print("\n" + _BANNER)
         print("AI CODE REVIEW")
-        print("=" * 60)
+        print(_BANNER)
         
-        file_path = input("Enter file path to review: ").strip()
+        file_path = (await ainput("Enter file path to review: ")).strip()
         
         if not file_path:
             print("No file specified.\n")
@@ -220,41 +322,37 @@ class EnhancedTerminalClient:
         
         print(f"\n🔍 Reviewing {file_path}...\n")
         
-        response = await self.agent.answer(
+        await stream_answer(
+            self.agent,
             f"Please perform an AI code review on {file_path}. "
             f"Check for code quality, security issues, and style problems."
         )
-        
-        print(response)
-        print()
     
     async def generate_docs_interactive(self):
         """Interactive documentation generation"""
-        print("\n" + "=" * 60)
+        print("\n" + _BANNER)
         print("GENERATE PROJECT DOCUMENTATION")
-        print("=" * 60)
+        print(_BANNER)
         
-        project_root = input("Enter project root (default: current directory): ").strip()
+        project_root = (await ainput("Enter project root (default: current directory): ")).strip()
         if not project_root:
             project_root = "."
         
         print(f"\n📝 Generating documentation for {project_root}...\n")
         
-        response = await self.agent.answer(
+        await stream_answer(
+            self.agent,
             f"Generate comprehensive project documentation for {project_root}. "
             f"Include README, API docs, architecture overview, and examples."
         )
-        
-        print(response)
-        print()
     
     async def semantic_search_interactive(self):
         """Interactive semantic code search"""
-        print("\n" + "=" * 60)
+        print("\n" + _BANNER)
         print("SEMANTIC CODE SEARCH")
-        print("=" * 60)
+        print(_BANNER)
         
-        query = input("Enter your search query: ").strip()
+        query = (await ainput("Enter your search query: ")).strip()
         
         if not query:
             print("No query specified.\n")
@@ -262,107 +360,74 @@ class EnhancedTerminalClient:
         
         print(f"\n🔍 Searching for: {query}...\n")
         
-        response = await self.agent.answer(
+        await stream_answer(
+            self.agent,
             f"Search the codebase for: {query}"
         )
-        
-        print(response)
-        print()
     
     async def system_monitor(self):
         """Show system monitoring dashboard"""
-        print("\n" + "=" * 60)
+        print("\n" + _BANNER)
         print("SYSTEM MONITORING DASHBOARD")
-        print("=" * 60)
+        print(_BANNER)
         
         try:
+            # Fetch all three monitors concurrently - latency is the slowest read, not the sum
+            cpu_result, mem_result, disk_result = await asyncio.gather(
+                self._cached_read("terminal", "monitor://cpu"),
+                self._cached_read("terminal", "monitor://memory"),
+                self._cached_read("terminal", "monitor://disk"),
+                return_exceptions=True
+            )
+            
             # CPU
             print("\n📊 CPU Usage:")
-            cpu_result = await self.client.read_resource("terminal", "monitor://cpu")
-            if hasattr(cpu_result, '__iter__') and len(cpu_result) > 0:
-                first_item = cpu_result[0]
-                if hasattr(first_item, 'contents'):
-                    import json
-                    cpu_data = json.loads(first_item.contents)
-                    print(f"  System: {cpu_data.get('system', {}).get('cpu_percent', 0)}%")
-                    if 'server_process' in cpu_data:
-                        print(f"  Server: {cpu_data['server_process'].get('cpu_percent', 0)}%")
+            if isinstance(cpu_result, Exception):
+                print(f"  Error: {cpu_result}")
+            elif (cpu_data := _decode_resource(cpu_result)) is not None:
+                print(f"  System: {cpu_data.get('system', {}).get('cpu_percent', 0)}%")
+                if 'server_process' in cpu_data:
+                    print(f"  Server: {cpu_data['server_process'].get('cpu_percent', 0)}%")
             
             # Memory
             print("\n💾 Memory Usage:")
-            mem_result = await self.client.read_resource("terminal", "monitor://memory")
-            if hasattr(mem_result, '__iter__') and len(mem_result) > 0:
-                first_item = mem_result[0]
-                if hasattr(first_item, 'contents'):
-                    import json
-                    mem_data = json.loads(first_item.contents)
-                    sys_mem = mem_data.get('system', {})
-                    print(f"  Total: {sys_mem.get('total_gb', 0)} GB")
-                    print(f"  Used: {sys_mem.get('used_gb', 0)} GB ({sys_mem.get('percent', 0)}%)")
-                    print(f"  Available: {sys_mem.get('available_gb', 0)} GB")
+            if isinstance(mem_result, Exception):
+                print(f"  Error: {mem_result}")
+            elif (mem_data := _decode_resource(mem_result)) is not None:
+                sys_mem = mem_data.get('system', {})
+                print(f"  Total: {sys_mem.get('total_gb', 0)} GB")
+                print(f"  Used: {sys_mem.get('used_gb', 0)} GB ({sys_mem.get('percent', 0)}%)")
+                print(f"  Available: {sys_mem.get('available_gb', 0)} GB")
             
             # Disk
             print("\n💿 Disk Usage:")
-            disk_result = await self.client.read_resource("terminal", "monitor://disk")
-            if hasattr(disk_result, '__iter__') and len(disk_result) > 0:
-                first_item = disk_result[0]
-                if hasattr(first_item, 'contents'):
-                    import json
-                    disk_data = json.loads(first_item.contents)
-                    workspace = disk_data.get('workspace', {})
-                    if workspace:
-                        print(f"  Total: {workspace.get('total_gb', 0)} GB")
-                        print(f"  Used: {workspace.get('used_gb', 0)} GB ({workspace.get('percent', 0)}%)")
-                        print(f"  Free: {workspace.get('free_gb', 0)} GB")
+            if isinstance(disk_result, Exception):
+                print(f"  Error: {disk_result}")
+            elif (disk_data := _decode_resource(disk_result)) is not None:
+                workspace = disk_data.get('workspace', {})
+                if workspace:
+                    print(f"  Total: {workspace.get('total_gb', 0)} GB")
+                    print(f"  Used: {workspace.get('used_gb', 0)} GB ({workspace.get('percent', 0)}%)")
+                    print(f"  Free: {workspace.get('free_gb', 0)} GB")
             
-            print("\n" + "=" * 60 + "\n")
+            print("\n" + _BANNER + "\n")
         
         except Exception as e:
             print(f"\nError fetching monitoring data: {e}\n")
     
     def show_help(self):
         """Show all available commands"""
-        print("\n" + "=" * 60)
+        print("\n" + _BANNER)
         print("AVAILABLE COMMANDS")
-        print("=" * 60)
-        print("""
-📋 Information:
-  tools      - List all available tools
-  resources  - List all available resources
-  help       - Show this help message
-
-📊 Monitoring:
-  metrics    - Show tool performance metrics
-  cache      - Show cache statistics
-  monitor    - System monitoring dashboard
-
-🤖 AI Features:
-  review     - AI code review on a file
-  docs       - Generate project documentation
-  search     - Semantic code search
-
-💬 Interaction:
-  chat       - Interactive chat mode
-  exit/quit  - Exit the application
-
-📝 Direct Commands:
-  Any other input is treated as a natural language query
-  and will be processed by the AI agent with full tool access.
-
-Examples:
-  > analyze the code quality of app.py
-  > find all functions without error handling
-  > show me system resource usage
-  > create a backup of config.py
-  > review src/main.py for security issues
-        """)
-        print("=" * 60 + "\n")
+        print(_BANNER)
+        print(_HELP_TEXT)
+        print(_BANNER + "\n")
 
 
 async def main():
-    print("=" * 60)
+    print(_BANNER)
     print("🚀 Terminal MCP Client - Production Mode")
-    print("=" * 60)
+    print(_BANNER)
     print("\n✨ Features:")
     print("  • 42+ Advanced Tools")
     print("  • 9 Monitoring Resources")
@@ -373,81 +438,63 @@ async def main():
     print()
 
     async with MCPAppClient() as mcp_client:
+        n_tools = len(mcp_client._tools)
+        n_resources = len(mcp_client._resources)
+        n_prompts = len(mcp_client._prompts)
+        
         print("✓ Connected to MCP server")
-        print(f"  Tools     : {len(mcp_client._tools)}")
-        print(f"  Resources : {len(mcp_client._resources)}")
-        print(f"  Prompts   : {len(mcp_client._prompts)}")
+        print(f"  Tools     : {n_tools}")
+        print(f"  Resources : {n_resources}")
+        print(f"  Prompts   : {n_prompts}")
         print()
 
         agent = TerminalAgent(mcp_client, debug_mode=AGENT_DEBUG_MODE)
         enhanced_client = EnhancedTerminalClient(mcp_client, agent)
         
+        # Async REPL commands, dispatched by a single dict lookup per turn
+        commands = {
+            "tools": enhanced_client.show_tools,
+            "resources": enhanced_client.show_resources,
+            "metrics": enhanced_client.show_metrics,
+            "cache": enhanced_client.show_cache_stats,
+            "review": enhanced_client.ai_code_review_interactive,
+            "docs": enhanced_client.generate_docs_interactive,
+            "search": enhanced_client.semantic_search_interactive,
+            "monitor": enhanced_client.system_monitor,
+        }
+        
         print("💡 Type 'help' for all commands, 'exit' to quit")
         print("-" * 60)
 
         while True:
             try:
-                user_input = input("🖥️  > ").strip()
+                user_input = (await ainput("🖥️  > ")).strip()
+                cmd = user_input.lower() if len(user_input) <= _MAX_CMD_LEN else ""
+
+                handler = commands.get(cmd)
+                if handler:
+                    await handler()
+                    continue
 
                 # Exit
-                if user_input.lower() in ["exit", "quit"]:
+                if cmd in _EXIT_CMDS:
                     print("👋 Closing client...")
                     break
 
                 # Help
-                if user_input.lower() == "help":
+                if cmd == "help":
                     enhanced_client.show_help()
                     continue
 
-                # List tools
-                if user_input.lower() == "tools":
-                    await enhanced_client.show_tools()
-                    continue
-
-                # List resources
-                if user_input.lower() == "resources":
-                    await enhanced_client.show_resources()
-                    continue
-
-                # Show metrics
-                if user_input.lower() == "metrics":
-                    await enhanced_client.show_metrics()
-                    continue
-
-                # Show cache stats
-                if user_input.lower() == "cache":
-                    await enhanced_client.show_cache_stats()
-                    continue
-
-                # AI Code Review
-                if user_input.lower() == "review":
-                    await enhanced_client.ai_code_review_interactive()
-                    continue
-
-                # Generate Docs
-                if user_input.lower() == "docs":
-                    await enhanced_client.generate_docs_interactive()
-                    continue
-
-                # Semantic Search
-                if user_input.lower() == "search":
-                    await enhanced_client.semantic_search_interactive()
-                    continue
-
-                # System Monitor
-                if user_input.lower() == "monitor":
-                    await enhanced_client.system_monitor()
-                    continue
-
                 # Interactive Chat Mode
-                if user_input.lower() == "chat":
+                if cmd == "chat":
                     print("\n💬 Chat mode (all features enabled)")
                     print("Type 'exit' to return\n")
 
                     while True:
-                        msg = input("💬 > ").strip()
+                        msg = (await ainput("💬 > ")).strip()
 
-                        if msg.lower() in ["exit", "quit"]:
+                        if len(msg) <= _MAX_CMD_LEN and msg.lower() in _EXIT_CMDS:
                             print("Leaving chat mode...\n")
                             break
 
@@ -456,9 +503,7 @@ async def main():
 
                         try:
                             print("\n🤖 Thinking...\n")
-                            response = await agent.answer(msg)
-                            print(response)
-                            print()
+                            await stream_answer(agent, msg)
                         except Exception as e:
                             print(f"❌ Error: {e}\n")
 
@@ -471,9 +516,7 @@ async def main():
                 print("\n🤖 Processing...\n")
 
                 try:
-                    response = await agent.answer(user_input)
-                    print(response)
-                    print()
+                    await stream_answer(agent, user_input)
                 except Exception as e:
                     print(f"❌ Error: {e}\n")
 
@@ -494,6 +537,5 @@ if __name__ == "__main__":
         sys.exit(0)
     except Exception as e:
         print(f"\n❌ Fatal error: {e}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
\ No newline at end of file
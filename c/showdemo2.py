@@ -20,10 +20,12 @@ import asyncio
 import sys
 
 from client import MCPAppClient
-from agent_verbose import TerminalAgent
 
 
 async def main():
+    # Deferred so importing this module doesn't pull in the agent stack
+    from agent_verbose import TerminalAgent
+
     print("=" * 60)
     print("Terminal MCP Client (Production Mode)")
     print("=" * 60)
@@ -58,7 +60,7 @@ async def main():
                     print("\n💬 Chat mode (tools enabled)")
                     print("Type 'exit' to enter\n")
 
-                    whil True:
+                    while True:
                         msg = input("💬 > ").strip()
 
                         if msg.lower() in ["exit", "quit"]:
@@ -66,7 +68,7 @@ async def main():
                             break
 
                         if not msg:
-                            continu
+                            continue
 
                         try:
                             print("\n🤖 Thinking...\n")
@@ -94,7 +96,7 @@ async def main():
                 except Exception as e:
                     print(f"Error: {e}\n")
 
-            except :
+            except KeyboardInterrupt:
                 print("\n\n👋 Interrupted. Closing client...")
                 break
             except EOFError:
@@ -109,7 +111,7 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("\n\n👋 Goodbye!")
         sys.exit(0)
-     Exception as e:
+    except Exception as e:
         print(f"\n❌ Fatal error: {e}")
         import traceback
         traceback.print_exc()
@@ -5,682 +5,146 @@ Complete Feature Set: Streaming + Persistence + Advanced UI + All Power Features
 INTEGRATED WITH ENHANCED PHASE 1-7 AGENT
 """
 
-import streamlit as st
-import asyncio
-import threading
+import html
 import json
+import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional, AsyncGenerator
+from typing import Dict, List, Any, Optional, AsyncGenerator, Callable
 from pathlib import Path
-import sqlite3
-import hashlib
-import time
 import re
+import secrets
+import time
+import traceback
 from collections import deque
+from functools import lru_cache
+
+# Heavy dependencies (Streamlit, sqlite, the MCP client/agent stack) are bound
+# lazily by _ensure_imports() so importing this module stays cheap.
+st = None
+components = None
+asyncio = None
+threading = None
+queue = None
+sqlite3 = None
+MCPAppClient = None
+TerminalAgent = None
+AGENT_DEBUG_MODE = False
+
+log = logging.getLogger("mcp")
+
+
+def _ensure_db_imports():
+    """Import what ConversationDB needs - sqlite3 and threading only"""
+    global threading, sqlite3
+
+    if sqlite3 is not None:
+        return
+
+    import threading as _threading
+    import sqlite3 as _sqlite3
+
+    threading, sqlite3 = _threading, _sqlite3
+
+
+def _ensure_imports():
+    """Import the UI and runtime dependencies on first use"""
+    global st, components, asyncio, queue
+    global MCPAppClient, TerminalAgent, AGENT_DEBUG_MODE
+
+    if st is not None:
+        return
+
+    _ensure_db_imports()
+
+    import streamlit as _st
+    import streamlit.components.v1 as _components
+    import asyncio as _asyncio
+    import queue as _queue
+
+    # Import your existing modules
+    from client import MCPAppClient as _MCPAppClient
+    from agent import TerminalAgent as _TerminalAgent  # Using your enhanced agent
+    from config import AGENT_DEBUG_MODE as _AGENT_DEBUG_MODE
+
+    asyncio, queue = _asyncio, _queue
+    MCPAppClient, TerminalAgent = _MCPAppClient, _TerminalAgent
+    AGENT_DEBUG_MODE = _AGENT_DEBUG_MODE
+    components = _components
+    st = _st
 
-# Import your existing modules
-from client import MCPAppClient
-from agent import TerminalAgent  # Using your enhanced agent
-from config import AGENT_DEBUG_MODE
 
 # ============================================================
 # PAGE CONFIG
 # ============================================================
 
-st.set_page_config(
-    page_title="Terminal MCP Ultimate",
-    page_icon="⚡",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+def _configure_page():
+    st.set_page_config(
+        page_title="Terminal MCP Ultimate",
+        page_icon="⚡",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
 
 # ============================================================
 # CSS - FIXED SIDEBAR TOGGLE + CHAMPIONSHIP DESIGN
 # ============================================================
 
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@400;500;600;700;800&family=Space+Grotesk:wght@300;400;500;600;700;800;900&family=Inter:wght@300;400;500;600;700;800;900&display=swap');
-
-    /* ==================== GLOBAL FOUNDATION ==================== */
-
-    :root {
-        --primary-gradient: linear-gradient(135deg, #00ff88 0%, #00d4ff 50%, #0099ff 100%);
-        --secondary-gradient: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        --dark-gradient: linear-gradient(135deg, #0a0e27 0%, #1a1f3a 50%, #0f1429 100%);
-        --glass-bg: rgba(255, 255, 255, 0.05);
-        --glass-border: rgba(255, 255, 255, 0.1);
-        --neon-green: #00ff88;
-        --neon-blue: #00d4ff;
-        --neon-purple: #a78bfa;
-        --neon-orange: #ff6b35;
-        --dark-bg: #0a0e27;
-        --card-bg: rgba(26, 31, 58, 0.6);
-    }
-
-    * {
-        box-sizing: border-box;
-    }
-
-    .stApp {
-        background: var(--dark-gradient);
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-        color: #e0e0e0;
-    }
-
-    #MainMenu, footer, header { visibility: hidden; }
-
-    /* ==================== SIDEBAR TOGGLE - ALWAYS VISIBLE ==================== */
-
-    /* The >>> button when sidebar is COLLAPSED - must always show */
-    [data-testid="collapsedControl"] {
-        display: flex !important;
-        visibility: visible !important;
-        opacity: 1 !important;
-        pointer-events: all !important;
-        position: fixed !important;
-        left: 0 !important;
-        top: 50% !important;
-        transform: translateY(-50%) !important;
-        z-index: 9999999 !important;
-        background: linear-gradient(135deg, #00ff88 0%, #00d4ff 100%) !important;
-        color: #0a0e27 !important;
-        border: none !important;
-        border-radius: 0 14px 14px 0 !important;
-        width: 28px !important;
-        min-width: 28px !important;
-        height: 72px !important;
-        padding: 0 !important;
-        cursor: pointer !important;
-        box-shadow: 4px 0 24px rgba(0, 255, 136, 0.6) !important;
-        transition: width 0.2s ease, box-shadow 0.2s ease !important;
-        align-items: center !important;
-        justify-content: center !important;
-        flex-direction: column !important;
-        gap: 4px !important;
-    }
-
-    [data-testid="collapsedControl"]:hover {
-        width: 38px !important;
-        box-shadow: 6px 0 36px rgba(0, 255, 136, 0.9) !important;
-    }
-
-    /* Override any SVG inside the collapsed button */
-    [data-testid="collapsedControl"] svg {
-        color: #0a0e27 !important;
-        fill: #0a0e27 !important;
-        width: 14px !important;
-        height: 14px !important;
-    }
-
-    /* The <<< button inside the sidebar when it IS expanded */
-    [data-testid="baseButton-header"] {
-        display: flex !important;
-        visibility: visible !important;
-        opacity: 1 !important;
-        background: rgba(0, 255, 136, 0.1) !important;
-        border: 1px solid rgba(0, 255, 136, 0.35) !important;
-        color: #00ff88 !important;
-        border-radius: 8px !important;
-        padding: 6px 10px !important;
-        cursor: pointer !important;
-        transition: all 0.2s ease !important;
-    }
-
-    [data-testid="baseButton-header"]:hover {
-        background: rgba(0, 255, 136, 0.25) !important;
-        border-color: #00ff88 !important;
-        box-shadow: 0 0 16px rgba(0, 255, 136, 0.3) !important;
-    }
-
-    [data-testid="baseButton-header"] svg {
-        color: #00ff88 !important;
-        fill: #00ff88 !important;
-    }
-
-    /* Sidebar background */
-    section[data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #0a0e27 0%, #1a1f3a 100%) !important;
-        border-right: 2px solid rgba(0, 255, 136, 0.25) !important;
-    }
-
-    section[data-testid="stSidebar"] > div:first-child {
-        padding-top: 16px !important;
-    }
-
-    /* ==================== ULTRA PREMIUM HEADER ==================== */
-
-    .ultra-header {
-        background: linear-gradient(135deg, rgba(0, 255, 136, 0.15) 0%, rgba(0, 212, 255, 0.15) 100%);
-        backdrop-filter: blur(20px);
-        border: 2px solid rgba(0, 255, 136, 0.3);
-        border-radius: 24px;
-        padding: 30px 40px;
-        margin-bottom: 30px;
-        box-shadow:
-            0 20px 60px rgba(0, 255, 136, 0.3),
-            0 0 100px rgba(0, 212, 255, 0.2),
-            inset 0 1px 0 rgba(255, 255, 255, 0.1);
-        position: relative;
-        overflow: hidden;
-        animation: headerGlow 3s ease-in-out infinite;
-    }
-
-    @keyframes headerGlow {
-        0%, 100% { box-shadow: 0 20px 60px rgba(0, 255, 136, 0.3), 0 0 100px rgba(0, 212, 255, 0.2); }
-        50% { box-shadow: 0 20px 60px rgba(0, 255, 136, 0.5), 0 0 120px rgba(0, 212, 255, 0.4); }
-    }
-
-    .ultra-header::before {
-        content: '';
-        position: absolute;
-        top: -50%;
-        left: -50%;
-        width: 200%;
-        height: 200%;
-        background: conic-gradient(
-            from 0deg,
-            transparent 0deg,
-            rgba(0, 255, 136, 0.1) 30deg,
-            transparent 90deg,
-            transparent 180deg,
-            rgba(0, 212, 255, 0.1) 210deg,
-            transparent 270deg,
-            transparent 360deg
-        );
-        animation: rotate 20s linear infinite;
-    }
-
-    @keyframes rotate {
-        100% { transform: rotate(360deg); }
-    }
-
-    .ultra-header::after {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.1), transparent);
-        animation: shine 5s infinite;
-    }
-
-    @keyframes shine {
-        0% { left: -100%; }
-        50%, 100% { left: 200%; }
-    }
-
-    .header-content {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        position: relative;
-        z-index: 2;
-        gap: 20px;
-        flex-wrap: wrap;
-    }
-
-    .header-left {
-        flex: 1;
-        min-width: 300px;
-    }
-
-    .header-title {
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 42px;
-        font-weight: 900;
-        background: var(--primary-gradient);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        margin: 0;
-        letter-spacing: -1.5px;
-        animation: titlePulse 3s ease-in-out infinite;
-        line-height: 1.1;
-    }
-
-    @keyframes titlePulse {
-        0%, 100% { transform: scale(1); }
-        50% { transform: scale(1.01); }
-    }
-
-    .header-subtitle {
-        font-size: 14px;
-        color: rgba(0, 255, 136, 0.9);
-        font-weight: 700;
-        margin-top: 8px;
-        letter-spacing: 3px;
-        text-transform: uppercase;
-        font-family: 'JetBrains Mono', monospace;
-    }
-
-    .header-badges {
-        display: flex;
-        gap: 10px;
-        margin-top: 12px;
-        flex-wrap: wrap;
-    }
-
-    .header-badge {
-        background: linear-gradient(135deg, rgba(255, 215, 0, 0.2), rgba(255, 140, 0, 0.2));
-        border: 2px solid rgba(255, 215, 0, 0.6);
-        color: #ffd700;
-        padding: 5px 14px;
-        border-radius: 20px;
-        font-size: 11px;
-        font-weight: 700;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-        font-family: 'JetBrains Mono', monospace;
-    }
-
-    .connection-status-pro {
-        background: rgba(10, 14, 39, 0.95);
-        border: 2px solid rgba(0, 255, 136, 0.4);
-        padding: 20px 24px;
-        border-radius: 20px;
-        font-family: 'JetBrains Mono', monospace;
-        display: flex;
-        flex-direction: column;
-        align-items: center;
-        gap: 10px;
-        min-width: 150px;
-    }
-
-    .status-indicator {
-        display: flex;
-        align-items: center;
-        gap: 12px;
-        font-weight: 700;
-        font-size: 14px;
-    }
-
-    .status-dot-pro {
-        width: 14px;
-        height: 14px;
-        border-radius: 50%;
-        flex-shrink: 0;
-    }
-
-    .status-online {
-        background: #00ff88;
-        box-shadow: 0 0 20px rgba(0, 255, 136, 0.8);
-        animation: pulseDot 2s ease-in-out infinite;
-    }
-
-    .status-connecting {
-        background: #ffaa00;
-        box-shadow: 0 0 20px rgba(255, 170, 0, 0.8);
-        animation: pulseDot 1s ease-in-out infinite;
-    }
-
-    .status-offline {
-        background: #ff4444;
-        box-shadow: 0 0 20px rgba(255, 68, 68, 0.8);
-    }
-
-    @keyframes pulseDot {
-        0%, 100% { transform: scale(1); opacity: 1; }
-        50% { transform: scale(1.3); opacity: 0.7; }
-    }
-
-    .status-text-online { color: #00ff88; }
-    .status-text-connecting { color: #ffaa00; }
-    .status-text-offline { color: #ff4444; }
-
-    .status-uptime {
-        font-size: 11px;
-        color: rgba(255, 255, 255, 0.6);
-        font-weight: 600;
-    }
-
-    /* ==================== STATS GRID ==================== */
-
-    .stats-grid-pro {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
-        gap: 16px;
-        margin: 24px 0;
-    }
-
-    .stat-card-pro {
-        background: linear-gradient(135deg, rgba(0, 255, 136, 0.08) 0%, rgba(0, 212, 255, 0.08) 100%);
-        border: 2px solid rgba(0, 255, 136, 0.2);
-        border-radius: 18px;
-        padding: 24px 20px;
-        position: relative;
-        overflow: hidden;
-        transition: all 0.3s ease;
-        cursor: pointer;
-    }
-
-    .stat-card-pro:hover {
-        transform: translateY(-6px);
-        border-color: var(--neon-green);
-        box-shadow: 0 20px 50px rgba(0, 255, 136, 0.3);
-    }
-
-    .stat-icon-pro {
-        font-size: 36px;
-        margin-bottom: 12px;
-        display: block;
-        animation: floatIcon 3s ease-in-out infinite;
-    }
-
-    @keyframes floatIcon {
-        0%, 100% { transform: translateY(0px); }
-        50% { transform: translateY(-6px); }
-    }
-
-    .stat-label-pro {
-        color: var(--neon-green);
-        font-size: 11px;
-        font-weight: 800;
-        text-transform: uppercase;
-        letter-spacing: 2px;
-        margin-bottom: 8px;
-        display: block;
-        font-family: 'Space Grotesk', sans-serif;
-    }
-
-    .stat-value-pro {
-        color: #ffffff;
-        font-size: 40px;
-        font-weight: 900;
-        font-family: 'JetBrains Mono', monospace;
-        display: block;
-        line-height: 1;
-        letter-spacing: -1px;
-    }
-
-    .stat-sublabel-pro {
-        color: rgba(255, 255, 255, 0.5);
-        font-size: 12px;
-        margin-top: 8px;
-        display: block;
-    }
-
-    /* ==================== CHAT INTERFACE ==================== */
-
-    .chat-container-pro {
-        background: rgba(255, 255, 255, 0.02);
-        border: 1px solid rgba(255, 255, 255, 0.08);
-        border-radius: 20px;
-        padding: 24px;
-        min-height: 500px;
-        max-height: 600px;
-        overflow-y: auto;
-        margin-bottom: 20px;
-    }
-
-    .message-wrapper-pro {
-        margin: 0 0 24px 0;
-        animation: messageSlide 0.3s ease-out;
-    }
-
-    @keyframes messageSlide {
-        from { opacity: 0; transform: translateY(8px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-
-    .message-user-pro {
-        color: #e8e8e8;
-        margin: 0 0 8px 0;
-        font-family: 'Inter', sans-serif;
-        font-size: 15px;
-        word-wrap: break-word;
-        line-height: 1.6;
-    }
-
-    .message-assistant-pro {
-        background: rgba(255, 255, 255, 0.04);
-        border-left: 3px solid rgba(0, 255, 136, 0.6);
-        color: #e8e8e8;
-        padding: 18px 22px;
-        border-radius: 0 12px 12px 12px;
-        font-family: 'Inter', sans-serif;
-        line-height: 1.7;
-        font-size: 14px;
-        word-wrap: break-word;
-    }
-
-    .message-header {
-        display: flex;
-        align-items: center;
-        gap: 10px;
-        margin-bottom: 10px;
-        font-weight: 600;
-        font-size: 13px;
-        color: rgba(255, 255, 255, 0.55);
-    }
-
-    .message-avatar {
-        width: 26px;
-        height: 26px;
-        border-radius: 8px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 14px;
-        background: rgba(0, 255, 136, 0.15);
-        border: 1px solid rgba(0, 255, 136, 0.3);
-        flex-shrink: 0;
-    }
-
-    .message-content {
-        line-height: 1.7;
-        color: #e8e8e8;
-    }
-
-    .message-timestamp-pro {
-        font-size: 11px;
-        opacity: 0.45;
-        margin-top: 8px;
-        font-family: 'JetBrains Mono', monospace;
-        display: inline-block;
-    }
-
-    /* Welcome screen */
-    .welcome-screen {
-        display: flex;
-        flex-direction: column;
-        align-items: center;
-        justify-content: center;
-        height: 380px;
-        text-align: center;
-        gap: 16px;
-    }
-
-    .welcome-icon {
-        font-size: 72px;
-        animation: floatIcon 3s ease-in-out infinite;
-        filter: drop-shadow(0 0 20px rgba(0, 255, 136, 0.5));
-    }
-
-    .welcome-title {
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 26px;
-        font-weight: 800;
-        background: var(--primary-gradient);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-    }
-
-    .welcome-text {
-        color: rgba(255, 255, 255, 0.6);
-        font-size: 15px;
-        max-width: 420px;
-        line-height: 1.7;
-    }
-
-    /* ==================== INPUT AREA ==================== */
-
-    .input-container-pro {
-        background: linear-gradient(135deg, rgba(10, 14, 39, 0.9) 0%, rgba(26, 31, 58, 0.7) 100%);
-        border: 2px solid rgba(0, 255, 136, 0.35);
-        border-radius: 20px;
-        padding: 20px 24px;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-    }
-
-    .stTextInput > div > div > input {
-        background: rgba(0, 0, 0, 0.6) !important;
-        border: 2px solid rgba(0, 255, 136, 0.4) !important;
-        color: #f0f0f0 !important;
-        font-family: 'Inter', sans-serif !important;
-        font-size: 15px !important;
-        border-radius: 14px !important;
-        padding: 16px 20px !important;
-        transition: all 0.3s ease !important;
-    }
-
-    .stTextInput > div > div > input:focus {
-        border-color: var(--neon-green) !important;
-        box-shadow: 0 0 0 4px rgba(0, 255, 136, 0.12),
-                    0 8px 30px rgba(0, 255, 136, 0.2) !important;
-        background: rgba(0, 0, 0, 0.8) !important;
-    }
-
-    .stTextInput > div > div > input::placeholder {
-        color: rgba(255, 255, 255, 0.35) !important;
-    }
-
-    .stTextInput > label { display: none !important; }
-
-    /* ==================== MAIN BUTTONS ==================== */
-
-    .stButton > button {
-        background: linear-gradient(135deg, #00ff88 0%, #00d4ff 100%) !important;
-        color: #0a0e27 !important;
-        border: none !important;
-        border-radius: 14px !important;
-        padding: 16px 28px !important;
-        font-family: 'Space Grotesk', sans-serif !important;
-        font-weight: 800 !important;
-        font-size: 13px !important;
-        box-shadow: 0 8px 25px rgba(0, 255, 136, 0.4) !important;
-        transition: all 0.25s ease !important;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-    }
-
-    .stButton > button:hover {
-        transform: translateY(-3px) !important;
-        box-shadow: 0 12px 35px rgba(0, 255, 136, 0.6) !important;
-    }
-
-    .stButton > button:active {
-        transform: translateY(-1px) !important;
-    }
-
-    /* ==================== SIDEBAR INTERNALS ==================== */
-
-    section[data-testid="stSidebar"] .stMarkdown h2 {
-        color: var(--neon-green) !important;
-        font-family: 'Space Grotesk', sans-serif !important;
-        font-size: 18px !important;
-        font-weight: 800 !important;
-    }
-
-    section[data-testid="stSidebar"] .stMarkdown h3 {
-        color: rgba(255, 255, 255, 0.8) !important;
-        font-family: 'Space Grotesk', sans-serif !important;
-        font-size: 14px !important;
-        font-weight: 700 !important;
-    }
-
-    /* Sidebar buttons styled differently from main buttons */
-    section[data-testid="stSidebar"] .stButton > button {
-        background: rgba(0, 255, 136, 0.1) !important;
-        color: #00ff88 !important;
-        border: 1px solid rgba(0, 255, 136, 0.3) !important;
-        box-shadow: none !important;
-        font-size: 12px !important;
-        padding: 10px 14px !important;
-        transform: none !important;
-    }
-
-    section[data-testid="stSidebar"] .stButton > button:hover {
-        background: rgba(0, 255, 136, 0.2) !important;
-        border-color: var(--neon-green) !important;
-        box-shadow: 0 4px 15px rgba(0, 255, 136, 0.2) !important;
-        transform: none !important;
-    }
-
-    /* Sidebar download button */
-    section[data-testid="stSidebar"] .stDownloadButton > button {
-        background: rgba(0, 255, 136, 0.1) !important;
-        color: #00ff88 !important;
-        border: 1px solid rgba(0, 255, 136, 0.3) !important;
-        box-shadow: none !important;
-        font-size: 12px !important;
-        padding: 10px 14px !important;
-    }
-
-    section[data-testid="stSidebar"] .stDownloadButton > button:hover {
-        background: rgba(0, 255, 136, 0.2) !important;
-    }
-
-    /* Sidebar expanders */
-    .streamlit-expanderHeader {
-        background: rgba(0, 255, 136, 0.08) !important;
-        border: 1px solid rgba(0, 255, 136, 0.2) !important;
-        border-radius: 10px !important;
-        color: var(--neon-green) !important;
-        font-family: 'Space Grotesk', sans-serif !important;
-        font-weight: 700 !important;
-        font-size: 13px !important;
-        padding: 12px 16px !important;
-    }
-
-    .streamlit-expanderHeader:hover {
-        background: rgba(0, 255, 136, 0.15) !important;
-        border-color: var(--neon-green) !important;
-    }
-
-    /* Success/Warning/Error alerts in sidebar */
-    section[data-testid="stSidebar"] .stSuccess {
-        background: rgba(0, 255, 136, 0.1) !important;
-        border: 1px solid rgba(0, 255, 136, 0.3) !important;
-        color: #00ff88 !important;
-        border-radius: 10px !important;
-    }
-
-    section[data-testid="stSidebar"] .stWarning {
-        background: rgba(255, 170, 0, 0.1) !important;
-        border: 1px solid rgba(255, 170, 0, 0.3) !important;
-        color: #ffaa00 !important;
-        border-radius: 10px !important;
-    }
-
-    section[data-testid="stSidebar"] .stError {
-        background: rgba(255, 68, 68, 0.1) !important;
-        border: 1px solid rgba(255, 68, 68, 0.3) !important;
-        color: #ff4444 !important;
-        border-radius: 10px !important;
-    }
-
-    /* ==================== SCROLLBAR ==================== */
-
-    ::-webkit-scrollbar { width: 8px; height: 8px; }
-    ::-webkit-scrollbar-track { background: rgba(0, 0, 0, 0.4); border-radius: 4px; }
-    ::-webkit-scrollbar-thumb {
-        background: linear-gradient(180deg, #00ff88, #00d4ff);
-        border-radius: 4px;
-    }
-    ::-webkit-scrollbar-thumb:hover { background: #00ff88; }
-
-    /* ==================== RESPONSIVE ==================== */
-
-    @media (max-width: 768px) {
-        .header-title { font-size: 28px; }
-        .stats-grid-pro { grid-template-columns: repeat(2, 1fr); }
-        .header-content { flex-direction: column; }
-    }
-</style>
-""", unsafe_allow_html=True)
+# Served by Streamlit static file serving (see .streamlit/config.toml), so
+# the browser fetches and caches it instead of receiving it over the websocket.
+# app.css is the editable source; app.min.css is generated from it.
+_CSS_SRC = Path(__file__).with_name("static") / "app.css"
+_CSS_MIN = _CSS_SRC.with_name("app.min.css")
+
+
+def _minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a stylesheet"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def _stylesheet_href() -> str:
+    """Regenerate app.min.css if the source is newer and return the URL to load"""
+    try:
+        if not _CSS_MIN.exists() or _CSS_MIN.stat().st_mtime < _CSS_SRC.stat().st_mtime:
+            _CSS_MIN.write_text(_minify_css(_CSS_SRC.read_text(encoding="utf-8")), encoding="utf-8")
+        return "app/static/app.min.css"
+    except OSError:
+        # Read-only checkout etc. - the unminified file works just as well
+        return "app/static/app.css"
+
+
+def _inject_css():
+    """Load the stylesheet into the page once per session.
+
+    Streamlit removes elements that are not re-emitted on a rerun, so the
+    styles go into the parent document's <head>, where they survive reruns.
+    Static serving sends .css as text/plain (with nosniff), which browsers
+    refuse for <link rel=stylesheet>, so the file is fetched into a <style>.
+    """
+    if st.session_state.get("_css_injected"):
+        return
+
+    # cache_resource: the freshness check and minify run once per server process
+    href = st.cache_resource(_stylesheet_href)()
+
+    components.html(f"""
+    <script>
+        const doc = window.parent.document;
+        if (!doc.getElementById("mcp-ultimate-css")) {{
+            const style = doc.createElement("style");
+            style.id = "mcp-ultimate-css";
+            doc.head.appendChild(style);
+            fetch(new URL({json.dumps(href)}, doc.baseURI))
+                .then((resp) => resp.text())
+                .then((css) => {{ style.textContent = css; }});
+        }}
+    </script>
+    """, height=0)
+    st.session_state["_css_injected"] = True
 
 
 # ============================================================
@@ -691,272 +155,466 @@ class ConversationDB:
     """Enterprise-grade conversation persistence"""
 
     def __init__(self, db_path: str = "mcp_conversations.db"):
+        _ensure_db_imports()
         self.db_path = db_path
+        # One long-lived connection per thread instead of connect/close per call
+        self._local = threading.local()
+        # Keyed by (session_id, updated_at): any write bumps updated_at, so
+        # stale entries are simply never hit again
+        self._session_cache = lru_cache(maxsize=16)(self._query_session)
         self.init_db()
 
+    def _conn(self):
+        """Return this thread's connection, opening and tuning it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA temp_store=MEMORY")
+            except sqlite3.OperationalError:
+                pass  # read-only location: keep the default journal
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
     def init_db(self):
         """Initialize database with schema"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id TEXT PRIMARY KEY,
-                title TEXT,
-                created_at TEXT,
-                updated_at TEXT,
-                total_messages INTEGER,
-                total_tools_used INTEGER
-            )
-        ''')
+        conn = self._conn()
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    created_at TEXT,
+                    updated_at TEXT,
+                    total_messages INTEGER,
+                    total_tools_used INTEGER
+                )
+            ''')
+
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT,
+                    role TEXT,
+                    content TEXT,
+                    timestamp TEXT,
+                    FOREIGN KEY (session_id) REFERENCES sessions (session_id)
+                )
+            ''')
 
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT,
-                role TEXT,
-                content TEXT,
-                timestamp TEXT,
-                FOREIGN KEY (session_id) REFERENCES sessions (session_id)
-            )
-        ''')
+            # load_session filters by session and orders by id: make it a range scan
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_messages_session
+                ON messages (session_id, id)
+            ''')
 
-        conn.commit()
-        conn.close()
+            # The sidebar's "recent sessions" list becomes an index top-n
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_sessions_updated
+                ON sessions (updated_at DESC)
+            ''')
 
     def create_session(self, session_id: str, title: str = "New Conversation"):
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
         now = datetime.now().isoformat()
-        c.execute('''
-            INSERT OR REPLACE INTO sessions
-            (session_id, title, created_at, updated_at, total_messages, total_tools_used)
-            VALUES (?, ?, ?, ?, 0, 0)
-        ''', (session_id, title, now, now))
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO sessions
+                (session_id, title, created_at, updated_at, total_messages, total_tools_used)
+                VALUES (?, ?, ?, ?, 0, 0)
+            ''', (session_id, title, now, now))
 
     def save_message(self, session_id: str, role: str, content: str, timestamp: str):
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''
-            INSERT INTO messages (session_id, role, content, timestamp)
-            VALUES (?, ?, ?, ?)
-        ''', (session_id, role, content, timestamp))
-        c.execute('''
-            UPDATE sessions
-            SET updated_at = ?, total_messages = total_messages + 1
-            WHERE session_id = ?
-        ''', (datetime.now().isoformat(), session_id))
-        conn.commit()
-        conn.close()
-
-    def load_session(self, session_id: str) -> List[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''
+        with self._conn() as conn:
+            conn.execute('''
+                INSERT INTO messages (session_id, role, content, timestamp)
+                VALUES (?, ?, ?, ?)
+            ''', (session_id, role, content, timestamp))
+            conn.execute('''
+                UPDATE sessions
+                SET updated_at = ?, total_messages = total_messages + 1
+                WHERE session_id = ?
+            ''', (timestamp, session_id))
+
+    def save_exchange(self, session_id: str, user_content: str, assistant_content: str, timestamp: str):
+        """Persist a user/assistant pair and bump the counter in one transaction"""
+        with self._conn() as conn:
+            conn.executemany('''
+                INSERT INTO messages (session_id, role, content, timestamp)
+                VALUES (?, ?, ?, ?)
+            ''', [(session_id, 'user', user_content, timestamp),
+                  (session_id, 'assistant', assistant_content, timestamp)])
+            conn.execute('''
+                UPDATE sessions
+                SET updated_at = ?, total_messages = total_messages + 2
+                WHERE session_id = ?
+            ''', (timestamp, session_id))
+
+    def _query_session(self, session_id: str, updated_at: Optional[str] = None) -> tuple:
+        c = self._conn().execute('''
             SELECT role, content, timestamp FROM messages
             WHERE session_id = ? ORDER BY id ASC
         ''', (session_id,))
-        messages = [{'role': r[0], 'content': r[1], 'timestamp': r[2]} for r in c.fetchall()]
-        conn.close()
-        return messages
+        return tuple(dict(r) for r in c)
+
+    def load_session(self, session_id: str) -> List[Dict]:
+        row = self._conn().execute(
+            'SELECT updated_at FROM sessions WHERE session_id = ?', (session_id,)
+        ).fetchone()
+        if row is None:
+            return list(self._query_session(session_id))
+        # Fresh list per call - callers append to it
+        return list(self._session_cache(session_id, row['updated_at']))
+
+    def get_recent_sessions(self, limit: int = 5) -> List[Dict]:
+        c = self._conn().execute('''
+            SELECT session_id, title, updated_at
+            FROM sessions ORDER BY updated_at DESC LIMIT ?
+        ''', (limit,))
+        return [dict(r) for r in c]
 
     def get_all_sessions(self) -> List[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''
+        c = self._conn().execute('''
             SELECT session_id, title, created_at, updated_at, total_messages, total_tools_used
             FROM sessions ORDER BY updated_at DESC
         ''')
-        sessions = [{'session_id': r[0], 'title': r[1], 'created_at': r[2],
-                     'updated_at': r[3], 'total_messages': r[4], 'total_tools_used': r[5]}
-                    for r in c.fetchall()]
-        conn.close()
-        return sessions
+        return [dict(r) for r in c]
 
 
 # ============================================================
 # MCP CONNECTION MANAGER
 # ============================================================
 
+# Streamed chunks are pushed to the UI in batches to limit DOM updates
+_STREAM_BATCH = 20
+
+
 class UltimateMCPManager:
     """Championship-level MCP manager with all Phase 1-7 features"""
 
     def __init__(self):
+        _ensure_imports()
         self.mcp_client = None
         self.agent = None
         self.loop = None
         self.thread = None
+        self._shutdown_event = None
         self.connected = False
         self.connecting = False
+        # Set by the background thread once the connection attempt settles
+        self._ready = threading.Event()
+
+        # (capabilities rev, listing), rebuilt after a (re)connect or capability reload
+        self._tools_cache = None
+        self._resources_cache = None
+        self._prompts_cache = None
 
         self.stats = {
             'messages_sent': 0,
             'tools_called': 0,
             'resources_accessed': 0,
             'uptime_start': datetime.now(),
-            'avg_response_time': 0.0,
+            'total_response_time': 0.0,
             'successful_operations': 0,
             'failed_operations': 0
         }
+        # (monotonic second, text) - the uptime string only changes once a second
+        self._uptime_cache = (-1, "")
 
         self.db = ConversationDB()
 
     def start(self):
         if self.thread is None or not self.thread.is_alive():
             self.connecting = True
+            self._ready.clear()
             self.thread = threading.Thread(target=self._run_loop, daemon=True)
             self.thread.start()
-            for _ in range(150):
-                if self.connected:
-                    break
-                time.sleep(0.1)
+            self._ready.wait(timeout=15)
 
     def _run_loop(self):
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
+        self._shutdown_event = asyncio.Event()
         self.loop.run_until_complete(self._connect())
 
+    def stop(self):
+        """Ask the background loop to close the MCP connection"""
+        if self.loop is not None and self._shutdown_event is not None:
+            self.loop.call_soon_threadsafe(self._shutdown_event.set)
+
     async def _connect(self):
         try:
             async with MCPAppClient() as mcp_client:
                 self.mcp_client = mcp_client
+                self._invalidate_capabilities()
                 self.agent = TerminalAgent(mcp_client, debug_mode=AGENT_DEBUG_MODE)
                 self.connected = True
                 self.connecting = False
-                while True:
-                    await asyncio.sleep(0.1)
+                self._ready.set()
+                # Hold the connection open until stop(); the loop idles meanwhile
+                await self._shutdown_event.wait()
+                self.connected = False
         except Exception as e:
             self.connected = False
             self.connecting = False
-            print(f"Connection error: {e}")
+            self._invalidate_capabilities()
+            self.stats['failed_operations'] += 1
+            self._ready.set()
+            log.exception("Connection error: %s", e)
+
+    def _invalidate_capabilities(self):
+        self._tools_cache = None
+        self._resources_cache = None
+        self._prompts_cache = None
+
+    def _capabilities_rev(self) -> int:
+        return getattr(self.mcp_client, '_capabilities_rev', 0)
 
     def get_tools(self) -> List[Dict[str, Any]]:
         if not self.connected or not self.mcp_client:
             return []
-        return [{'name': t.name, 'description': t.description or f'Tool: {t.name}',
-                 'schema': t.inputSchema} for t in self.mcp_client._tools]
+        rev = self._capabilities_rev()
+        if self._tools_cache is None or self._tools_cache[0] != rev:
+            self._tools_cache = (rev, [{'name': t.name, 'description': t.description or f'Tool: {t.name}',
+                                        'schema': t.inputSchema} for t in self.mcp_client._tools])
+        return self._tools_cache[1]
 
     def get_resources(self) -> List[Dict[str, Any]]:
         if not self.connected or not self.mcp_client:
             return []
-        resources = []
-        for r in self.mcp_client._resources:
-            uri = str(r.uri)
-            resources.append({'uri': uri, 'name': r.name or uri.split('/')[-1] or uri,
-                               'description': r.description or f'Resource: {uri}'})
-        return resources
+        rev = self._capabilities_rev()
+        if self._resources_cache is None or self._resources_cache[0] != rev:
+            resources = []
+            for r in self.mcp_client._resources:
+                uri = str(r.uri)
+                resources.append({'uri': uri, 'name': r.name or uri.split('/')[-1] or uri,
+                                   'description': r.description or f'Resource: {uri}'})
+            self._resources_cache = (rev, resources)
+        return self._resources_cache[1]
 
     def get_prompts(self) -> List[Dict[str, Any]]:
         if not self.connected or not self.mcp_client:
             return []
-        return [{'name': p.name, 'description': p.description or f'Prompt: {p.name}'}
-                for p in self.mcp_client._prompts]
-
-    def process_message(self, user_input: str, session_id: str) -> Dict[str, Any]:
+        rev = self._capabilities_rev()
+        if self._prompts_cache is None or self._prompts_cache[0] != rev:
+            self._prompts_cache = (rev, [{'name': p.name, 'description': p.description or f'Prompt: {p.name}'}
+                                         for p in self.mcp_client._prompts])
+        return self._prompts_cache[1]
+
+    def process_message(self, user_input: str, session_id: str,
+                        on_chunk: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Run the agent on the background loop, streaming the answer as it arrives.
+
+        on_chunk, if given, is called on this thread with the text so far
+        every _STREAM_BATCH chunks and once more when the answer is complete.
+        """
         if not self.connected or self.agent is None:
             return {'success': False, 'response': '❌ Connection lost. Please reconnect.',
                     'timestamp': datetime.now().isoformat(), 'execution_time': 0.0}
 
         self.stats['messages_sent'] += 1
         start_time = time.time()
-        result_container = {}
+        # The loop thread feeds ('chunk', text) items and finishes with ('done', result)
+        chunks = queue.SimpleQueue()
 
         async def _process():
             try:
-                response = await self.agent.answer(user_input)
+                parts = []
+                async for chunk in self.agent.answer_stream(user_input):
+                    parts.append(chunk)
+                    chunks.put(('chunk', chunk))
+                response = "".join(parts)
                 elapsed = time.time() - start_time
-                n = self.stats['messages_sent']
-                self.stats['avg_response_time'] = (
-                    (self.stats['avg_response_time'] * (n - 1) + elapsed) / n
-                )
+                self.stats['total_response_time'] += elapsed
                 self.stats['successful_operations'] += 1
-                result_container['result'] = {
+                chunks.put(('done', {
                     'success': True, 'response': response,
                     'timestamp': datetime.now().isoformat(), 'execution_time': elapsed
-                }
+                }))
             except Exception as e:
-                import traceback
                 self.stats['failed_operations'] += 1
-                result_container['result'] = {
+                # The full stack trace is only worth formatting when debugging
+                detail = f"{e}\n{traceback.format_exc()}" if AGENT_DEBUG_MODE else str(e)
+                chunks.put(('done', {
                     'success': False,
-                    'response': f"❌ **Error:**\n\n```python\n{str(e)}\n{traceback.format_exc()}\n```",
+                    'response': f"❌ **Error:**\n\n```python\n{detail}\n```",
                     'timestamp': datetime.now().isoformat(),
                     'execution_time': time.time() - start_time
-                }
+                }))
 
         future = asyncio.run_coroutine_threadsafe(_process(), self.loop)
-        try:
-            future.result(timeout=300)
-        except Exception as e:
-            return {'success': False, 'response': f'❌ Timeout: {str(e)}',
-                    'timestamp': datetime.now().isoformat(),
-                    'execution_time': time.time() - start_time}
+        deadline = time.monotonic() + 300
+        parts = []
+        result = None
+        while result is None:
+            try:
+                kind, payload = chunks.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                future.cancel()
+                return {'success': False, 'response': '❌ Timeout: no response within 300s',
+                        'timestamp': datetime.now().isoformat(),
+                        'execution_time': time.time() - start_time}
+            if kind == 'done':
+                result = payload
+            else:
+                parts.append(payload)
+                if on_chunk is not None and len(parts) % _STREAM_BATCH == 0:
+                    on_chunk("".join(parts))
 
-        result = result_container.get('result', {
-            'success': False, 'response': '❌ Processing failed',
-            'timestamp': datetime.now().isoformat(),
-            'execution_time': time.time() - start_time
-        })
+        if on_chunk is not None and result['success']:
+            on_chunk(result['response'])
 
-        ts = result['timestamp']
-        self.db.save_message(session_id, 'user', user_input, ts)
-        self.db.save_message(session_id, 'assistant', result['response'], ts)
+        self.db.save_exchange(session_id, user_input, result['response'], result['timestamp'])
 
         return result
 
+    @property
+    def avg_response_time(self) -> float:
+        """Mean time of successful answers, derived from the running total"""
+        return self.stats['total_response_time'] / max(1, self.stats['successful_operations'])
+
     def get_uptime(self) -> str:
         if not self.connected:
             return "Offline"
+        now = int(time.monotonic())
+        if self._uptime_cache[0] == now:
+            return self._uptime_cache[1]
         total = int((datetime.now() - self.stats['uptime_start']).total_seconds())
         h, rem = divmod(total, 3600)
         m, s = divmod(rem, 60)
         if h > 0:
-            return f"{h}h {m}m"
+            text = f"{h}h {m}m"
         elif m > 0:
-            return f"{m}m {s}s"
+            text = f"{m}m {s}s"
         else:
-            return f"{s}s"
+            text = f"{s}s"
+        self._uptime_cache = (now, text)
+        return text
 
 
 # ============================================================
 # RENDERING FUNCTIONS
 # ============================================================
 
-def render_message_pro(message: Dict[str, Any]):
-    """Render chat message"""
-    timestamp = message.get('timestamp', datetime.now().isoformat())
+# Only the tail of the history is rendered by default; older turns load on
+# request so long sessions don't re-render everything per rerun
+_VISIBLE_MESSAGES = 30
+# Bigger messages bypass the markdown pipeline and render as plain text
+_MAX_MARKDOWN_CHARS = 50_000
+
+# Chat bubble markup, flush-left so consecutive bubbles can share one
+# markdown block without being read as indented code. Content goes in
+# escaped, with newlines as <br>: one message's stray HTML, code fence or
+# blank line can't leak into the bubbles after it.
+_USER_TMPL = """<div class="message-wrapper-pro">
+<div class="message-user-pro">
+<div class="message-header">
+<div class="message-avatar">👤</div>
+<span>You</span>
+</div>
+<div class="message-content">{content}</div>
+</div>
+</div>"""
+
+_ASSISTANT_TMPL = """<div class="message-wrapper-pro">
+<div class="message-assistant-pro">
+<div class="message-header">
+<div class="message-avatar">🤖</div>
+<span>Assistant</span>
+</div>
+<div class="message-content">{content}</div>
+<span class="message-timestamp-pro">{time_str}</span>
+</div>
+</div>"""
+
+_STATS_TMPL = """<div class="stats-grid-pro">
+    <div class="stat-card-pro">
+        <span class="stat-icon-pro">💬</span>
+        <span class="stat-label-pro">Messages</span>
+        <span class="stat-value-pro">{messages}</span>
+        <span class="stat-sublabel-pro">This session</span>
+    </div>
+    <div class="stat-card-pro">
+        <span class="stat-icon-pro">🔧</span>
+        <span class="stat-label-pro">Tools</span>
+        <span class="stat-value-pro">{tools}</span>
+        <span class="stat-sublabel-pro">Available</span>
+    </div>
+    <div class="stat-card-pro">
+        <span class="stat-icon-pro">📁</span>
+        <span class="stat-label-pro">Resources</span>
+        <span class="stat-value-pro">{resources}</span>
+        <span class="stat-sublabel-pro">Accessible</span>
+    </div>
+    <div class="stat-card-pro">
+        <span class="stat-icon-pro">⚡</span>
+        <span class="stat-label-pro">Response</span>
+        <span class="stat-value-pro">{avg:.1f}s</span>
+        <span class="stat-sublabel-pro">Average</span>
+    </div>
+    <div class="stat-card-pro">
+        <span class="stat-icon-pro">✅</span>
+        <span class="stat-label-pro">Success</span>
+        <span class="stat-value-pro">{success:.0f}%</span>
+        <span class="stat-sublabel-pro">Rate</span>
+    </div>
+</div>"""
+
+
+@lru_cache(maxsize=1024)
+def _format_time(timestamp: str) -> str:
+    """ISO timestamp -> '03:04 PM'; each distinct stamp is parsed once"""
     try:
-        time_str = datetime.fromisoformat(timestamp).strftime('%I:%M %p')
+        return datetime.fromisoformat(timestamp).strftime('%I:%M %p')
     except:
-        time_str = "Now"
+        return "Now"
 
-    if message["role"] == "user":
-        st.markdown(f"""
-        <div class="message-wrapper-pro">
-            <div class="message-user-pro">
-                <div class="message-header">
-                    <div class="message-avatar">👤</div>
-                    <span>You</span>
-                </div>
-                <div class="message-content">{message["content"]}</div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        st.markdown(f"""
-        <div class="message-wrapper-pro">
-            <div class="message-assistant-pro">
-                <div class="message-header">
-                    <div class="message-avatar">🤖</div>
-                    <span>Assistant</span>
-                </div>
-                <div class="message-content">{message["content"]}</div>
-                <span class="message-timestamp-pro">{time_str}</span>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+
+def _message_time(message: Dict[str, Any]) -> str:
+    timestamp = message.get('timestamp')
+    if timestamp is None:
+        return datetime.now().strftime('%I:%M %p')
+    return _format_time(timestamp)
+
+
+def render_messages_pro(messages: List[Dict[str, Any]]):
+    """Render chat messages, batching runs of bubbles into one markdown call"""
+    pending = []
+    for message in messages:
+        time_str = _message_time(message)
+
+        if len(message["content"]) > _MAX_MARKDOWN_CHARS:
+            if pending:
+                st.markdown("\n".join(pending), unsafe_allow_html=True)
+                pending = []
+            st.caption("👤 You" if message["role"] == "user" else f"🤖 Assistant • {time_str}")
+            st.text(message["content"])
+            continue
+
+        template = _USER_TMPL if message["role"] == "user" else _ASSISTANT_TMPL
+        content = html.escape(message["content"]).replace("\n", "<br>")
+        pending.append(template.format(content=content, time_str=time_str))
+
+    if pending:
+        st.markdown("\n".join(pending), unsafe_allow_html=True)
+
+
+def _export_json(messages: List[Dict[str, Any]]) -> str:
+    """Chat export as JSON, serializing each message only once.
+
+    Messages are append-only until the list is replaced (clear, new or
+    loaded session), so the per-message fragments are kept alongside the
+    list they came from and only the new tail is dumped on each call.
+    """
+    cached = st.session_state.get('_export_parts')
+    if cached is None or cached[0] is not messages:
+        cached = (messages, [])
+        st.session_state._export_parts = cached
+    parts = cached[1]
+    parts.extend(json.dumps(m) for m in messages[len(parts):])
+    return "[" + ",".join(parts) + "]"
 
 
 def render_sidebar_pro(manager: UltimateMCPManager):
@@ -982,10 +640,11 @@ def render_sidebar_pro(manager: UltimateMCPManager):
         col1, col2 = st.columns(2)
         with col1:
             if st.button("➕ New", use_container_width=True, key="btn_new_session"):
-                new_id = hashlib.md5(str(datetime.now()).encode()).hexdigest()[:8]
+                new_id = secrets.token_hex(4)
                 manager.db.create_session(new_id)
                 st.session_state.current_session = new_id
                 st.session_state.messages = []
+                st.session_state.show_older = False
                 st.rerun()
 
         with col2:
@@ -993,15 +652,16 @@ def render_sidebar_pro(manager: UltimateMCPManager):
                 st.session_state.show_sessions = not st.session_state.get('show_sessions', False)
 
         if st.session_state.get('show_sessions', False):
-            sessions = manager.db.get_all_sessions()
+            sessions = manager.db.get_recent_sessions(5)
             if sessions:
-                for session in sessions[:5]:
+                for session in sessions:
                     title = session['title'][:20] + "..." if len(session['title']) > 20 else session['title']
                     is_active = session['session_id'] == st.session_state.get('current_session', '')
                     label = f"{'✅' if is_active else '📝'} {title}"
                     if st.button(label, key=f"session_{session['session_id']}", use_container_width=True):
                         st.session_state.current_session = session['session_id']
                         st.session_state.messages = manager.db.load_session(session['session_id'])
+                        st.session_state.show_older = False
                         st.session_state.show_sessions = False
                         st.rerun()
             else:
@@ -1050,7 +710,7 @@ def render_sidebar_pro(manager: UltimateMCPManager):
                 st.rerun()
         with col2:
             if st.session_state.get('messages'):
-                chat_json = json.dumps(st.session_state.messages, indent=2)
+                chat_json = _export_json(st.session_state.messages)
                 st.download_button(
                     "📥 Export",
                     data=chat_json,
@@ -1071,7 +731,7 @@ def render_sidebar_pro(manager: UltimateMCPManager):
         <div style="font-size: 13px; color: rgba(255,255,255,0.75);
                     line-height: 2.2; font-family: 'JetBrains Mono', monospace;">
             <div>💬 Messages: <strong style="color:#00ff88;">{manager.stats['messages_sent']}</strong></div>
-            <div>⚡ Avg Response: <strong style="color:#00ff88;">{manager.stats['avg_response_time']:.2f}s</strong></div>
+            <div>⚡ Avg Response: <strong style="color:#00ff88;">{manager.avg_response_time:.2f}s</strong></div>
             <div>✅ Success Rate: <strong style="color:#00ff88;">{success_rate:.0f}%</strong></div>
         </div>
         """, unsafe_allow_html=True)
@@ -1093,7 +753,7 @@ def main():
         st.session_state.mcp_manager.start()
 
     if 'current_session' not in st.session_state:
-        session_id = hashlib.md5(str(datetime.now()).encode()).hexdigest()[:8]
+        session_id = secrets.token_hex(4)
         st.session_state.current_session = session_id
         st.session_state.mcp_manager.db.create_session(session_id)
 
@@ -1112,43 +772,38 @@ def main():
 
     # Status content for header
     if manager.connected:
-        status_content = f'''
-        <div class="status-indicator">
-            <span class="status-dot-pro status-online"></span>
-            <span class="status-text-online">CONNECTED</span>
-        </div>
-        <span class="status-uptime">⏱️ {manager.get_uptime()}</span>
-        '''
+        status, label = 'online', 'CONNECTED'
     elif manager.connecting:
-        status_content = '''
-        <div class="status-indicator">
-            <span class="status-dot-pro status-connecting"></span>
-            <span class="status-text-connecting">CONNECTING...</span>
-        </div>
-        '''
+        status, label = 'connecting', 'CONNECTING...'
     else:
-        status_content = '''
-        <div class="status-indicator">
-            <span class="status-dot-pro status-offline"></span>
-            <span class="status-text-offline">DISCONNECTED</span>
+        status, label = 'offline', 'DISCONNECTED'
+    status_content = f'''
+        <div class="status-indicator" data-status="{status}">
+            <span class="status-dot-pro"></span>
+            <span class="status-label">{label}</span>
         </div>
         '''
+    if manager.connected:
+        status_content += f'<span class="status-uptime">⏱️ {manager.get_uptime()}</span>'
 
     # Header
     st.markdown(f"""
-    <div class="ultra-header">
-        <div class="header-content">
-            <div class="header-left">
-                <h1 class="header-title">⚡ Terminal MCP Ultimate</h1>
-                <div class="header-subtitle">🏆 Championship Edition • Phases 1-7 Complete</div>
-                <div class="header-badges">
-                    <span class="header-badge">42+ Tools</span>
-                    <span class="header-badge">9 Resources</span>
-                    <span class="header-badge">AI-Powered</span>
+    <div class="ultra-header-shell">
+        <div class="header-glow"></div>
+        <div class="ultra-header">
+            <div class="header-content">
+                <div class="header-left">
+                    <h1 class="header-title">⚡ Terminal MCP Ultimate</h1>
+                    <div class="header-subtitle">🏆 Championship Edition • Phases 1-7 Complete</div>
+                    <div class="header-badges">
+                        <span class="header-badge">42+ Tools</span>
+                        <span class="header-badge">9 Resources</span>
+                        <span class="header-badge">AI-Powered</span>
+                    </div>
+                </div>
+                <div class="connection-status-pro">
+                    {status_content}
                 </div>
-            </div>
-            <div class="connection-status-pro">
-                {status_content}
             </div>
         </div>
     </div>
@@ -1158,40 +813,13 @@ def main():
     total_ops = manager.stats['successful_operations'] + manager.stats['failed_operations']
     success_rate = (manager.stats['successful_operations'] / max(1, total_ops)) * 100
 
-    st.markdown(f"""
-    <div class="stats-grid-pro">
-        <div class="stat-card-pro">
-            <span class="stat-icon-pro">💬</span>
-            <span class="stat-label-pro">Messages</span>
-            <span class="stat-value-pro">{len(st.session_state.messages)}</span>
-            <span class="stat-sublabel-pro">This session</span>
-        </div>
-        <div class="stat-card-pro">
-            <span class="stat-icon-pro">🔧</span>
-            <span class="stat-label-pro">Tools</span>
-            <span class="stat-value-pro">{len(tools)}</span>
-            <span class="stat-sublabel-pro">Available</span>
-        </div>
-        <div class="stat-card-pro">
-            <span class="stat-icon-pro">📁</span>
-            <span class="stat-label-pro">Resources</span>
-            <span class="stat-value-pro">{len(resources)}</span>
-            <span class="stat-sublabel-pro">Accessible</span>
-        </div>
-        <div class="stat-card-pro">
-            <span class="stat-icon-pro">⚡</span>
-            <span class="stat-label-pro">Response</span>
-            <span class="stat-value-pro">{manager.stats['avg_response_time']:.1f}s</span>
-            <span class="stat-sublabel-pro">Average</span>
-        </div>
-        <div class="stat-card-pro">
-            <span class="stat-icon-pro">✅</span>
-            <span class="stat-label-pro">Success</span>
-            <span class="stat-value-pro">{success_rate:.0f}%</span>
-            <span class="stat-sublabel-pro">Rate</span>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_STATS_TMPL.format(
+        messages=len(st.session_state.messages),
+        tools=len(tools),
+        resources=len(resources),
+        avg=manager.avg_response_time,
+        success=success_rate,
+    ), unsafe_allow_html=True)
 
     # Chat Container
     st.markdown('<div class="chat-container-pro">', unsafe_allow_html=True)
@@ -1208,8 +836,16 @@ def main():
         </div>
         """, unsafe_allow_html=True)
     else:
-        for message in st.session_state.messages:
-            render_message_pro(message)
+        messages = st.session_state.messages
+        hidden = len(messages) - _VISIBLE_MESSAGES
+        if hidden > 0 and not st.session_state.get('show_older', False):
+            # Expander children are still sent every rerun, so older turns
+            # are only rendered once the user asks for them
+            if st.button(f"⬆️ Load {hidden} older messages", key="btn_load_older"):
+                st.session_state.show_older = True
+                st.rerun()
+            messages = messages[-_VISIBLE_MESSAGES:]
+        render_messages_pro(messages)
 
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -1259,8 +895,14 @@ def main():
             "timestamp": timestamp
         })
 
+        # Partial answers render into one placeholder; the rerun below
+        # replaces it with the regular message bubble
+        stream_box = st.empty()
         with st.spinner("🤖 Processing..."):
-            result = manager.process_message(user_input, st.session_state.current_session)
+            result = manager.process_message(
+                user_input, st.session_state.current_session,
+                on_chunk=lambda text: stream_box.markdown(text + " ▌")
+            )
 
         st.session_state.messages.append({
             "role": "assistant",
@@ -1271,5 +913,14 @@ def main():
         st.rerun()
 
 
+def _run_app():
+    """Streamlit entry point - pays the heavy import cost only when the app runs"""
+    _ensure_imports()
+    logging.basicConfig(level=logging.INFO)
+    _configure_page()
+    _inject_css()
+    main()
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    _run_app()
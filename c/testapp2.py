@@ -6,17 +6,23 @@ INTEGRATED WITH ENHANCED PHASE 1-7 AGENT
 """
 
 import streamlit as st
+import streamlit.components.v1 as components
 import asyncio
 import threading
+import queue
 import json
+import html
+import itertools
 from datetime import datetime
-from typing import Dict, List, Any, Optional, AsyncGenerator
+from typing import Dict, List, Any, Optional, AsyncGenerator, Iterator
 from pathlib import Path
 import sqlite3
-import hashlib
+import secrets
 import time
 import re
+import traceback
 from collections import deque
+from functools import lru_cache
 
 # Import your existing modules
 from client import MCPAppClient
@@ -38,8 +44,7 @@ st.set_page_config(
 # REVOLUTIONARY CSS - 10/10 CHAMPIONSHIP DESIGN
 # ============================================================
 
-st.markdown("""
-<style>
+_CSS = """
     @import url('https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@400;500;600;700;800&family=Space+Grotesk:wght@300;400;500;600;700;800;900&family=Inter:wght@300;400;500;600;700;800;900&display=swap');
     
     /* ==================== GLOBAL FOUNDATION ==================== */
@@ -494,8 +499,34 @@ st.markdown("""
             grid-template-columns: repeat(2, 1fr);
         }
     }
-</style>
-""", unsafe_allow_html=True)
+"""
+
+
+def _inject_css():
+    """Add _CSS to the page once per session.
+
+    Streamlit drops elements that are not re-emitted on a rerun, so a plain
+    st.markdown <style> would have to be re-sent every time; instead the
+    styles go into the parent document's <head>, where they survive reruns.
+    """
+    if st.session_state.get("_css_injected"):
+        return
+    
+    components.html(f"""
+    <script>
+        const doc = window.parent.document;
+        if (!doc.getElementById("mcp-testapp2-css")) {{
+            const style = doc.createElement("style");
+            style.id = "mcp-testapp2-css";
+            style.textContent = {json.dumps(_CSS)};
+            doc.head.appendChild(style);
+        }}
+    </script>
+    """, height=0)
+    st.session_state["_css_injected"] = True
+
+
+_inject_css()
 
 # ============================================================
 # DATABASE MANAGER FOR PERSISTENCE
@@ -506,105 +537,144 @@ class ConversationDB:
     
     def __init__(self, db_path: str = "mcp_conversations.db"):
         self.db_path = db_path
+        # One long-lived connection per thread instead of connect/close per call
+        self._local = threading.local()
         self.init_db()
     
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            try:
+                # WAL: readers don't block the writer and commits fsync less
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA temp_store=MEMORY")
+            except sqlite3.OperationalError:
+                pass  # read-only location: keep the default journal
+            self._local.conn = conn
+        return conn
+    
+    def close(self):
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
     def init_db(self):
         """Initialize database with schema"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        # Sessions table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id TEXT PRIMARY KEY,
-                title TEXT,
-                created_at TEXT,
-                updated_at TEXT,
-                total_messages INTEGER,
-                total_tools_used INTEGER
-            )
-        ''')
-        
-        # Messages table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT,
-                role TEXT,
-                content TEXT,
-                timestamp TEXT,
-                FOREIGN KEY (session_id) REFERENCES sessions (session_id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            # Sessions table
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    created_at TEXT,
+                    updated_at TEXT,
+                    total_messages INTEGER,
+                    total_tools_used INTEGER
+                )
+            ''')
+            
+            # Messages table
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT,
+                    role TEXT,
+                    content TEXT,
+                    timestamp TEXT,
+                    FOREIGN KEY (session_id) REFERENCES sessions (session_id)
+                )
+            ''')
+            
+            # load_session filters by session and orders by id: make it a range scan
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_messages_session
+                ON messages (session_id, id)
+            ''')
+            
+            # Lets get_recent_sessions' ORDER BY ... LIMIT read the index
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_sessions_updated
+                ON sessions (updated_at DESC)
+            ''')
     
     def create_session(self, session_id: str, title: str = "New Conversation"):
         """Create new session"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
         now = datetime.now().isoformat()
-        
-        c.execute('''
-            INSERT OR REPLACE INTO sessions 
-            (session_id, title, created_at, updated_at, total_messages, total_tools_used)
-            VALUES (?, ?, ?, ?, 0, 0)
-        ''', (session_id, title, now, now))
-        
-        conn.commit()
-        conn.close()
+        with self._conn() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO sessions 
+                (session_id, title, created_at, updated_at, total_messages, total_tools_used)
+                VALUES (?, ?, ?, ?, 0, 0)
+            ''', (session_id, title, now, now))
     
     def save_message(self, session_id: str, role: str, content: str, timestamp: str):
         """Save message to database"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('''
-            INSERT INTO messages (session_id, role, content, timestamp)
-            VALUES (?, ?, ?, ?)
-        ''', (session_id, role, content, timestamp))
-        
-        # Update session stats
-        c.execute('''
-            UPDATE sessions 
-            SET updated_at = ?, 
-                total_messages = total_messages + 1
-            WHERE session_id = ?
-        ''', (datetime.now().isoformat(), session_id))
-        
-        conn.commit()
-        conn.close()
-    
-    def load_session(self, session_id: str) -> List[Dict]:
-        """Load session messages"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('''
+        with self._conn() as conn:
+            conn.execute('''
+                INSERT INTO messages (session_id, role, content, timestamp)
+                VALUES (?, ?, ?, ?)
+            ''', (session_id, role, content, timestamp))
+            
+            # Update session stats
+            conn.execute('''
+                UPDATE sessions 
+                SET updated_at = ?, 
+                    total_messages = total_messages + 1
+                WHERE session_id = ?
+            ''', (timestamp, session_id))
+    
+    def save_messages_batch(self, session_id: str, rows: List[tuple]):
+        """Save several (role, content, timestamp) rows in one transaction"""
+        # The newest row's timestamp doubles as the session's updated_at
+        updated_at = rows[-1][2]
+        with self._conn() as conn:
+            conn.executemany('''
+                INSERT INTO messages (session_id, role, content, timestamp)
+                VALUES (?, ?, ?, ?)
+            ''', [(session_id, role, content, ts) for role, content, ts in rows])
+            
+            conn.execute('''
+                UPDATE sessions 
+                SET updated_at = ?, 
+                    total_messages = total_messages + ?
+                WHERE session_id = ?
+            ''', (updated_at, len(rows), session_id))
+    
+    def iter_session(self, session_id: str) -> Iterator[Dict]:
+        """Yield session messages straight off the cursor, oldest first"""
+        c = self._conn().execute('''
             SELECT role, content, timestamp
             FROM messages
             WHERE session_id = ?
-            ORDER BY id ASC
+            ORDER BY id
         ''', (session_id,))
         
-        messages = []
-        for row in c.fetchall():
-            messages.append({
-                'role': row[0],
-                'content': row[1],
-                'timestamp': row[2]
-            })
+        for role, content, timestamp in c:
+            yield {'role': role, 'content': content, 'timestamp': timestamp}
+    
+    def load_session(self, session_id: str) -> List[Dict]:
+        """Load session messages"""
+        return list(self.iter_session(session_id))
+    
+    def get_recent_sessions(self, limit: int = 5) -> List[Dict]:
+        """Most recently updated sessions, limited in SQL"""
+        rows = self._conn().execute('''
+            SELECT session_id, title, updated_at
+            FROM sessions
+            ORDER BY updated_at DESC
+            LIMIT ?
+        ''', (limit,)).fetchall()
         
-        conn.close()
-        return messages
+        return [{'session_id': r[0], 'title': r[1], 'updated_at': r[2]} for r in rows]
     
     def get_all_sessions(self) -> List[Dict]:
         """Get all sessions"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        c.execute('''
+        c = self._conn().execute('''
             SELECT session_id, title, created_at, updated_at, total_messages, total_tools_used
             FROM sessions
             ORDER BY updated_at DESC
@@ -621,7 +691,6 @@ class ConversationDB:
                 'total_tools_used': row[5]
             })
         
-        conn.close()
         return sessions
 
 
@@ -629,6 +698,10 @@ class ConversationDB:
 # ULTIMATE MCP CONNECTION MANAGER
 # ============================================================
 
+# Process-wide so catalog versions never collide between browser sessions
+_catalog_versions = itertools.count(1)
+
+
 class UltimateMCPManager:
     """Championship-level MCP manager with all Phase 1-7 features"""
     
@@ -637,18 +710,28 @@ class UltimateMCPManager:
         self.agent = None
         self.loop = None
         self.thread = None
+        self._shutdown_event = None
         self.connected = False
         self.connecting = False
+        # Set by the background thread once the connection attempt settles
+        self._ready = threading.Event()
+        # Bumped whenever the tool/resource/prompt lists may have changed
+        self.catalog_version = 0
+        # kind -> (catalog_version, listing)
+        self._listings = {}
         
         self.stats = {
             'messages_sent': 0,
             'tools_called': 0,
             'resources_accessed': 0,
             'uptime_start': datetime.now(),
-            'avg_response_time': 0.0,
+            'total_response_time': 0.0,
             'successful_operations': 0,
-            'failed_operations': 0
+            'failed_operations': 0,
+            'success_rate': 0.0
         }
+        # (monotonic second, text) - the uptime string only changes once a second
+        self._uptime_cache = (-1, "")
         
         self.db = ConversationDB()
         
@@ -656,36 +739,44 @@ class UltimateMCPManager:
         """Initialize MCP connection"""
         if self.thread is None or not self.thread.is_alive():
             self.connecting = True
+            self._ready.clear()
             self.thread = threading.Thread(target=self._run_loop, daemon=True)
             self.thread.start()
             
-            # Wait for connection
-            for _ in range(150):
-                if self.connected:
-                    break
-                time.sleep(0.1)
+            # Wait for connection (or failure), at most 15s
+            self._ready.wait(timeout=15)
     
     def _run_loop(self):
         """Background event loop"""
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
+        self._shutdown_event = asyncio.Event()
         self.loop.run_until_complete(self._connect())
     
+    def stop(self):
+        """Ask the background loop to close the MCP connection"""
+        if self.loop is not None and self._shutdown_event is not None:
+            self.loop.call_soon_threadsafe(self._shutdown_event.set)
+    
     async def _connect(self):
         """Maintain persistent connection"""
         try:
             async with MCPAppClient() as mcp_client:
                 self.mcp_client = mcp_client
+                self.catalog_version = next(_catalog_versions)
                 self.agent = TerminalAgent(mcp_client, debug_mode=AGENT_DEBUG_MODE)
                 self.connected = True
                 self.connecting = False
+                self._ready.set()
                 
-                # Keep connection alive
-                while True:
-                    await asyncio.sleep(0.1)
+                # Hold the connection open until stop(); the loop idles meanwhile
+                await self._shutdown_event.wait()
+                self.connected = False
         except Exception as e:
             self.connected = False
             self.connecting = False
+            self.catalog_version = next(_catalog_versions)
+            self._ready.set()
             print(f"Connection error: {e}")
     
     def get_tools(self) -> List[Dict[str, Any]]:
@@ -693,6 +784,10 @@ class UltimateMCPManager:
         if not self.connected or not self.mcp_client:
             return []
         
+        cached = self._listings.get('tools')
+        if cached is not None and cached[0] == self.catalog_version:
+            return cached[1]
+        
         tools = []
         for tool in self.mcp_client._tools:
             tools.append({
@@ -701,6 +796,7 @@ class UltimateMCPManager:
                 'schema': tool.inputSchema
             })
         
+        self._listings['tools'] = (self.catalog_version, tools)
         return tools
     
     def get_resources(self) -> List[Dict[str, Any]]:
@@ -708,6 +804,10 @@ class UltimateMCPManager:
         if not self.connected or not self.mcp_client:
             return []
         
+        cached = self._listings.get('resources')
+        if cached is not None and cached[0] == self.catalog_version:
+            return cached[1]
+        
         resources = []
         for resource in self.mcp_client._resources:
             uri = str(resource.uri)
@@ -717,6 +817,7 @@ class UltimateMCPManager:
                 'description': resource.description or f'Resource: {uri}'
             })
         
+        self._listings['resources'] = (self.catalog_version, resources)
         return resources
     
     def get_prompts(self) -> List[Dict[str, Any]]:
@@ -724,6 +825,10 @@ class UltimateMCPManager:
         if not self.connected or not self.mcp_client:
             return []
         
+        cached = self._listings.get('prompts')
+        if cached is not None and cached[0] == self.catalog_version:
+            return cached[1]
+        
         prompts = []
         for prompt in self.mcp_client._prompts:
             prompts.append({
@@ -731,84 +836,102 @@ class UltimateMCPManager:
                 'description': prompt.description or f'Prompt: {prompt.name}'
             })
         
+        self._listings['prompts'] = (self.catalog_version, prompts)
         return prompts
     
-    def process_message(self, user_input: str, session_id: str) -> Dict[str, Any]:
-        """Process user message with your enhanced agent"""
+    @property
+    def avg_response_time(self) -> float:
+        """Mean time of successful answers, derived from the running total"""
+        return self.stats['total_response_time'] / max(1, self.stats['successful_operations'])
+    
+    def _record_outcome(self, success: bool):
+        """Count an operation and refresh the success rate once, here"""
+        self.stats['successful_operations' if success else 'failed_operations'] += 1
+        total = self.stats['successful_operations'] + self.stats['failed_operations']
+        self.stats['success_rate'] = self.stats['successful_operations'] / total * 100
+    
+    def stream_message(self, user_input: str, session_id: str) -> Iterator[str]:
+        """Yield the agent's answer as it is produced, then save the turn.
+
+        Turns are deliberately handled one at a time: the agent plans each
+        question against the context left by the previous one, so merging
+        queued prompts into a batch would change the answers.
+        """
         if not self.connected or self.agent is None:
-            return {
-                'success': False,
-                'response': '❌ Connection lost. Please reconnect.',
-                'timestamp': datetime.now().isoformat(),
-                'execution_time': 0.0
-            }
+            yield '❌ Connection lost. Please reconnect.'
+            return
         
         self.stats['messages_sent'] += 1
         start_time = time.time()
-        result_container = {}
+        # Filled from the loop thread: text chunks, then an
+        # (exception, traceback text) pair or None
+        chunks = queue.SimpleQueue()
         
-        async def _process():
+        async def _produce():
             try:
-                # Use your enhanced agent
-                response = await self.agent.answer(user_input)
-                
-                elapsed = time.time() - start_time
-                
-                # Update stats
-                self.stats['avg_response_time'] = (
-                    (self.stats['avg_response_time'] * (self.stats['messages_sent'] - 1) + elapsed)
-                    / self.stats['messages_sent']
-                )
-                self.stats['successful_operations'] += 1
-                
-                result_container['result'] = {
-                    'success': True,
-                    'response': response,
-                    'timestamp': datetime.now().isoformat(),
-                    'execution_time': elapsed
-                }
-                
+                async for chunk in self.agent.answer_stream(user_input):
+                    chunks.put(chunk)
             except Exception as e:
-                self.stats['failed_operations'] += 1
-                import traceback
-                
-                result_container['result'] = {
-                    'success': False,
-                    'response': f"❌ **Error occurred:**\n\n```python\n{str(e)}\n{traceback.format_exc()}\n```",
-                    'timestamp': datetime.now().isoformat(),
-                    'execution_time': time.time() - start_time
-                }
+                # Walking and formatting the stack is only worth it when debugging
+                chunks.put((e, traceback.format_exc() if AGENT_DEBUG_MODE else ""))
+            finally:
+                chunks.put(None)
         
-        future = asyncio.run_coroutine_threadsafe(_process(), self.loop)
+        future = asyncio.run_coroutine_threadsafe(_produce(), self.loop)
+        deadline = time.monotonic() + 300
+        parts = []
+        error = None
+        success = None
         try:
-            future.result(timeout=300)
-        except Exception as e:
-            return {
-                'success': False,
-                'response': f'❌ Timeout or error: {str(e)}',
-                'timestamp': datetime.now().isoformat(),
-                'execution_time': time.time() - start_time
-            }
-        
-        result = result_container.get('result', {
-            'success': False,
-            'response': '❌ Processing failed',
-            'timestamp': datetime.now().isoformat(),
-            'execution_time': time.time() - start_time
-        })
-        
-        # Save to database
-        timestamp = result['timestamp']
-        self.db.save_message(session_id, 'user', user_input, timestamp)
-        self.db.save_message(session_id, 'assistant', result['response'], timestamp)
-        
-        return result
+            while True:
+                try:
+                    item = chunks.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    future.cancel()
+                    item = (TimeoutError("no response within 300s"), "")
+                if item is None:
+                    break
+                if isinstance(item, tuple):
+                    error = item
+                    break
+                parts.append(item)
+                yield item
+            
+            success = error is None
+            if not success:
+                exc, tb = error
+                failure = f"\n\n❌ **Error occurred:** {exc}"
+                if tb:
+                    failure += f"\n\n```python\n{tb}\n```"
+                parts.append(failure)
+                yield failure
+        finally:
+            # Also reached when Streamlit stops the run mid-stream (a new
+            # submit or a button click closes this generator): the answer
+            # is cut short, but the turn is still counted and saved
+            if success is None:
+                future.cancel()
+                success = False
+            if success:
+                self.stats['total_response_time'] += time.time() - start_time
+            self._record_outcome(success)
+            
+            # Save to database
+            timestamp = datetime.now().isoformat()
+            self.db.save_messages_batch(session_id, [
+                ('user', user_input, timestamp),
+                ('assistant', "".join(parts), timestamp)
+            ])
     
     def get_uptime(self) -> str:
         """Get formatted uptime"""
         if not self.connected:
             return "Offline"
         
+        now = int(time.monotonic())
+        if self._uptime_cache[0] == now:
+            return self._uptime_cache[1]
+        
         uptime = datetime.now() - self.stats['uptime_start']
         total_seconds = int(uptime.total_seconds())
         
@@ -817,182 +940,186 @@ class UltimateMCPManager:
         seconds = total_seconds % 60
         
         if hours > 0:
-            return f"{hours}h {minutes}m"
+            text = f"{hours}h {minutes}m"
         elif minutes > 0:
-            return f"{minutes}m {seconds}s"
+            text = f"{minutes}m {seconds}s"
         else:
-            return f"{seconds}s"
+            text = f"{seconds}s"
+        
+        self._uptime_cache = (now, text)
+        return text
 
 
 # ============================================================
 # RENDERING FUNCTIONS
 # ============================================================
 
-def render_message_pro(message: Dict[str, Any]):
-    """Render chat message"""
-    timestamp = message.get('timestamp', datetime.now().isoformat())
+# Only the newest messages are rendered each rerun; older ones load on request
+MAX_LIVE_MESSAGES = 50
+# In-memory history is capped; the full conversation stays in SQLite
+MAX_HISTORY = 500
+
+
+def _new_history(messages=()) -> deque:
+    """Bounded message history, keeping the newest MAX_HISTORY entries"""
+    return deque(messages, maxlen=MAX_HISTORY)
+
+
+@lru_cache(maxsize=4096)
+def _fmt_time(ts) -> str:
+    """Epoch seconds or '2024-01-01T13:05:00' -> '01:05 PM'"""
+    # Messages created in this session carry time.time(); ISO strings
+    # only come from rows loaded out of the database
+    if isinstance(ts, (int, float)):
+        return time.strftime('%I:%M %p', time.localtime(ts))
     try:
-        time_str = datetime.fromisoformat(timestamp).strftime('%I:%M %p')
-    except:
-        time_str = "Now"
-    
-    if message["role"] == "user":
-        st.markdown(f"""
+        return datetime.fromisoformat(ts).strftime('%I:%M %p')
+    except (TypeError, ValueError):
+        return "Now"
+
+
+@lru_cache(maxsize=1024)
+def _build_message_html(role: str, content: str, timestamp) -> str:
+    """Build a message's HTML; sent messages never change, so this is cached.
+
+    Content is escaped: it is user/LLM text, not markup. Newlines become
+    <br> so a blank line can't end the HTML block early when several
+    messages are emitted in one st.markdown call.
+    """
+    time_str = _fmt_time(timestamp)
+    content = html.escape(content).replace("\n", "<br>")
+    
+    if role == "user":
+        return f"""
         <div class="message-wrapper-pro">
             <div class="message-user-pro">
                 <div class="message-header">
                     <div class="message-avatar">👤</div>
                     <span>You</span>
                 </div>
-                <div class="message-content">{message["content"]}</div>
+                <div class="message-content">{content}</div>
             </div>
         </div>
-        """, unsafe_allow_html=True)
-    else:
-        st.markdown(f"""
+        """
+    return f"""
         <div class="message-wrapper-pro">
             <div class="message-assistant-pro">
                 <div class="message-header">
                     <div class="message-avatar">🤖</div>
                     <span>Assistant</span>
                 </div>
-                <div class="message-content">{message["content"]}</div>
+                <div class="message-content">{content}</div>
                 <span class="message-timestamp-pro">{time_str}</span>
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """
+
+
+def _message_html(message: Dict[str, Any]) -> str:
+    timestamp = message.get('timestamp', time.time())
+    return _build_message_html(message["role"], message["content"], timestamp)
+
+
+def render_message_pro(message: Dict[str, Any]):
+    """Render chat message"""
+    st.markdown(_message_html(message), unsafe_allow_html=True)
+
+
+@st.cache_data(show_spinner=False)
+def _catalog_markdown(kind: str, version: int, _items: tuple) -> str:
+    """Sidebar listing for one catalog; `_items` is unhashed, version keys the cache"""
+    return "\n\n".join(
+        f'**{name}**\n<div style="font-size: 12px; opacity: 0.6;">{html.escape(" ".join(desc.split()))}</div>'
+        for name, desc in _items
+    )
 
 
 def render_sidebar_pro(manager: UltimateMCPManager):
     """Enhanced sidebar with Phase 1-7 features"""
     
     with st.sidebar:
-        st.markdown("## 🎛️ Control Panel")
-        st.markdown("---")
-        
-        # Connection Status
-        if manager.connected:
-            st.success(f"🟢 **Connected** • ⏱️ {manager.get_uptime()}")
-        elif manager.connecting:
-            st.warning("🟡 **Connecting...**")
-        else:
-            st.error("🔴 **Offline**")
-        
-        st.markdown("---")
-        
-        # Session Management
-        st.markdown("### 💾 Sessions")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("➕ New", use_container_width=True):
-                new_id = hashlib.md5(str(datetime.now()).encode()).hexdigest()[:8]
-                manager.db.create_session(new_id)
-                st.session_state.current_session = new_id
-                st.session_state.messages = []
-                st.rerun()
-        
-        with col2:
-            if st.button("📂 Load", use_container_width=True):
-                st.session_state.show_sessions = not st.session_state.get('show_sessions', False)
-        
-        if st.session_state.get('show_sessions', False):
-            sessions = manager.db.get_all_sessions()
-            for session in sessions[:5]:
-                title = session['title'][:20] + "..." if len(session['title']) > 20 else session['title']
-                if st.button(f"📝 {title}", key=f"session_{session['session_id']}", use_container_width=True):
-                    st.session_state.current_session = session['session_id']
-                    st.session_state.messages = manager.db.load_session(session['session_id'])
-                    st.session_state.show_sessions = False
-                    st.rerun()
-        
-        st.markdown("---")
-        
-        # Tools, Resources, Prompts
-        tools = manager.get_tools()
-        resources = manager.get_resources()
-        prompts = manager.get_prompts()
-        
-        with st.expander(f"🔧 Tools ({len(tools)})", expanded=False):
-            for tool in tools[:10]:
-                st.markdown(f"**{tool['name']}**")
-                st.caption(tool['description'])
-        
-        with st.expander(f"📁 Resources ({len(resources)})", expanded=False):
-            for resource in resources[:10]:
-                st.markdown(f"**{resource['name']}**")
-                st.caption(resource['description'])
-        
-        with st.expander(f"💬 Prompts ({len(prompts)})", expanded=False):
-            for prompt in prompts:
-                st.markdown(f"**{prompt['name']}**")
-                st.caption(prompt['description'])
-        
-        st.markdown("---")
-        
-        # Stats
-        st.markdown("### 📊 Stats")
-        success_rate = (manager.stats['successful_operations'] / 
-                       max(1, manager.stats['successful_operations'] + manager.stats['failed_operations']) * 100)
-        
-        st.markdown(f"""
-        <div style="font-size: 12px; color: rgba(255,255,255,0.7); line-height: 2;">
-            <div>💬 Messages: <strong>{manager.stats['messages_sent']}</strong></div>
-            <div>⚡ Avg Response: <strong>{manager.stats['avg_response_time']:.2f}s</strong></div>
-            <div>✅ Success: <strong>{success_rate:.0f}%</strong></div>
-        </div>
-        """, unsafe_allow_html=True)
+        _sidebar_fragment(manager)
 
 
-def main():
-    """Main application"""
+@st.fragment
+def _sidebar_fragment(manager: UltimateMCPManager):
+    """Sidebar body - widget clicks in here rerun only the sidebar"""
+    st.markdown("## 🎛️ Control Panel")
+    st.markdown("---")
     
-    # Initialize session state
-    if 'messages' not in st.session_state:
-        st.session_state.messages = []
+    # Connection Status
+    if manager.connected:
+        st.success(f"🟢 **Connected** • ⏱️ {manager.get_uptime()}")
+    elif manager.connecting:
+        st.warning("🟡 **Connecting...**")
+    else:
+        st.error("🔴 **Offline**")
     
-    if 'mcp_manager' not in st.session_state:
-        st.session_state.mcp_manager = UltimateMCPManager()
-        st.session_state.mcp_manager.start()
+    st.markdown("---")
     
-    if 'current_session' not in st.session_state:
-        session_id = hashlib.md5(str(datetime.now()).encode()).hexdigest()[:8]
-        st.session_state.current_session = session_id
-        st.session_state.mcp_manager.db.create_session(session_id)
+    # Session Management
+    st.markdown("### 💾 Sessions")
     
-    manager = st.session_state.mcp_manager
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("➕ New", use_container_width=True):
+            new_id = secrets.token_hex(4)
+            manager.db.create_session(new_id)
+            st.session_state.current_session = new_id
+            st.session_state.messages = _new_history()
+            st.session_state.show_older = False
+            st.rerun()
     
-    # Render sidebar
-    render_sidebar_pro(manager)
+    with col2:
+        if st.button("📂 Load", use_container_width=True):
+            st.session_state.show_sessions = not st.session_state.get('show_sessions', False)
+    
+    if st.session_state.get('show_sessions', False):
+        for session in manager.db.get_recent_sessions(5):
+            title = session['title'][:20] + "..." if len(session['title']) > 20 else session['title']
+            if st.button(f"📝 {title}", key=f"session_{session['session_id']}", use_container_width=True):
+                st.session_state.current_session = session['session_id']
+                st.session_state.messages = _new_history(manager.db.iter_session(session['session_id']))
+                st.session_state.show_sessions = False
+                st.session_state.show_older = False
+                st.rerun()
+    
+    st.markdown("---")
     
-    # Header
+    # Tools, Resources, Prompts
     tools = manager.get_tools()
     resources = manager.get_resources()
+    prompts = manager.get_prompts()
     
-    if manager.connected:
-        status_content = f'''
-        <div class="status-indicator">
-            <span class="status-dot-pro status-online"></span>
-            <span class="status-text-online">CONNECTED</span>
-        </div>
-        <span class="status-uptime">⏱️ {manager.get_uptime()}</span>
-        '''
-    elif manager.connecting:
-        status_content = f'''
-        <div class="status-indicator">
-            <span class="status-dot-pro status-connecting"></span>
-            <span class="status-text-connecting">CONNECTING...</span>
-        </div>
-        '''
-    else:
-        status_content = f'''
-        <div class="status-indicator">
-            <span class="status-dot-pro status-offline"></span>
-            <span class="status-text-offline">DISCONNECTED</span>
-        </div>
-        '''
+    # One cached markdown block per catalog instead of two elements per item
+    version = manager.catalog_version
+    with st.expander(f"🔧 Tools ({len(tools)})", expanded=False):
+        st.markdown(_catalog_markdown("tools", version, tuple(
+            (t['name'], t['description']) for t in tools[:10])), unsafe_allow_html=True)
+    
+    with st.expander(f"📁 Resources ({len(resources)})", expanded=False):
+        st.markdown(_catalog_markdown("resources", version, tuple(
+            (r['name'], r['description']) for r in resources[:10])), unsafe_allow_html=True)
+    
+    with st.expander(f"💬 Prompts ({len(prompts)})", expanded=False):
+        st.markdown(_catalog_markdown("prompts", version, tuple(
+            (p['name'], p['description']) for p in prompts)), unsafe_allow_html=True)
     
+    st.markdown("---")
+    
+    # Stats
+    st.markdown("### 📊 Stats")
     st.markdown(f"""
+    <div style="font-size: 12px; color: rgba(255,255,255,0.7); line-height: 2;">
+        <div>💬 Messages: <strong>{manager.stats['messages_sent']}</strong></div>
+        <div>⚡ Avg Response: <strong>{manager.avg_response_time:.2f}s</strong></div>
+        <div>✅ Success: <strong>{manager.stats['success_rate']:.0f}%</strong></div>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+# Static markup is built once; reruns only fill in the dynamic slots
+_HEADER_TPL = """
     <div class="ultra-header">
         <div class="header-content">
             <div class="header-left">
@@ -1005,40 +1132,58 @@ def main():
                 </div>
             </div>
             <div class="connection-status-pro">
-                {status_content}
+                {{STATUS}}
             </div>
         </div>
     </div>
-    """, unsafe_allow_html=True)
-    
-    # Stats Dashboard
-    success_rate = (manager.stats['successful_operations'] / 
-                   max(1, manager.stats['successful_operations'] + manager.stats['failed_operations']) * 100)
-    
-    st.markdown(f"""
+    """
+
+_STATUS_HTML = {
+    'online': """
+        <div class="status-indicator">
+            <span class="status-dot-pro status-online"></span>
+            <span class="status-text-online">CONNECTED</span>
+        </div>
+        <span class="status-uptime">⏱️ {{UPTIME}}</span>
+        """,
+    'connecting': """
+        <div class="status-indicator">
+            <span class="status-dot-pro status-connecting"></span>
+            <span class="status-text-connecting">CONNECTING...</span>
+        </div>
+        """,
+    'offline': """
+        <div class="status-indicator">
+            <span class="status-dot-pro status-offline"></span>
+            <span class="status-text-offline">DISCONNECTED</span>
+        </div>
+        """,
+}
+
+_STATS_TPL = """
     <div class="stats-grid-pro">
         <div class="stat-card-pro">
             <span class="stat-icon-pro">💬</span>
             <span class="stat-label-pro">Messages</span>
-            <span class="stat-value-pro">{len(st.session_state.messages)}</span>
+            <span class="stat-value-pro">{messages}</span>
             <span class="stat-sublabel-pro">This session</span>
         </div>
         <div class="stat-card-pro">
             <span class="stat-icon-pro">🔧</span>
             <span class="stat-label-pro">Tools</span>
-            <span class="stat-value-pro">{len(tools)}</span>
+            <span class="stat-value-pro">{tools}</span>
             <span class="stat-sublabel-pro">Available</span>
         </div>
         <div class="stat-card-pro">
             <span class="stat-icon-pro">📁</span>
             <span class="stat-label-pro">Resources</span>
-            <span class="stat-value-pro">{len(resources)}</span>
+            <span class="stat-value-pro">{resources}</span>
             <span class="stat-sublabel-pro">Accessible</span>
         </div>
         <div class="stat-card-pro">
             <span class="stat-icon-pro">⚡</span>
             <span class="stat-label-pro">Response</span>
-            <span class="stat-value-pro">{manager.stats['avg_response_time']:.1f}s</span>
+            <span class="stat-value-pro">{avg_response:.1f}s</span>
             <span class="stat-sublabel-pro">Average</span>
         </div>
         <div class="stat-card-pro">
@@ -1048,65 +1193,166 @@ def main():
             <span class="stat-sublabel-pro">Rate</span>
         </div>
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+
+# How long the page keeps polling a pending first connection, on top of
+# the 15s start() already waited, before offering a retry instead
+CONNECT_POLL_SECONDS = 15
+
+# Shown instead of the full UI while the first connection is pending
+_CONNECTING_HTML = """
+    <div class="connection-status-pro" style="margin: 80px auto; max-width: 260px;">
+        <div class="status-indicator">
+            <span class="status-dot-pro status-connecting"></span>
+            <span class="status-text-connecting">CONNECTING...</span>
+        </div>
+    </div>
+    """
+
+
+def _render_header(manager: UltimateMCPManager):
+    """Header with connection status"""
+    if manager.connected:
+        status_content = _STATUS_HTML['online'].replace("{{UPTIME}}", manager.get_uptime())
+    elif manager.connecting:
+        status_content = _STATUS_HTML['connecting']
+    else:
+        status_content = _STATUS_HTML['offline']
+    
+    st.markdown(_HEADER_TPL.replace("{{STATUS}}", status_content), unsafe_allow_html=True)
+
+
+def _render_stats(manager: UltimateMCPManager):
+    """Stats dashboard"""
+    st.markdown(_STATS_TPL.format_map({
+        'messages': len(st.session_state.messages),
+        'tools': len(manager.get_tools()),
+        'resources': len(manager.get_resources()),
+        'avg_response': manager.avg_response_time,
+        'success_rate': manager.stats['success_rate']
+    }), unsafe_allow_html=True)
+
+
+def main():
+    """Main application"""
+    
+    # Initialize session state
+    if 'messages' not in st.session_state:
+        st.session_state.messages = _new_history()
+    
+    if 'mcp_manager' not in st.session_state:
+        st.session_state.mcp_manager = UltimateMCPManager()
+        st.session_state.mcp_manager.start()
+    
+    if 'current_session' not in st.session_state:
+        session_id = secrets.token_hex(4)
+        st.session_state.current_session = session_id
+        st.session_state.mcp_manager.db.create_session(session_id)
+    
+    manager = st.session_state.mcp_manager
+    
+    # Nothing to show yet - poll with a tiny page instead of the whole UI,
+    # but only until the deadline so a hung connection can't rerun forever
+    if manager.connecting and not st.session_state.messages:
+        deadline = st.session_state.setdefault(
+            'connect_deadline', time.monotonic() + CONNECT_POLL_SECONDS)
+        if time.monotonic() < deadline:
+            st.markdown(_CONNECTING_HTML, unsafe_allow_html=True)
+            time.sleep(0.3)
+            st.rerun()
+        
+        st.error("❌ Could not connect to the MCP server.")
+        if st.button("🔄 Retry connection"):
+            manager.stop()
+            # A fresh manager starts a new connection thread on the rerun
+            del st.session_state.mcp_manager
+            del st.session_state.connect_deadline
+            st.rerun()
+        st.stop()
+    st.session_state.pop('connect_deadline', None)
+    
+    # Render sidebar
+    render_sidebar_pro(manager)
+    
+    # Header and stats refresh on each full run (every submit); no idle polling
+    _render_header(manager)
+    _render_stats(manager)
     
     # Chat Container
     st.markdown('<div class="chat-container-pro">', unsafe_allow_html=True)
     
-    for message in st.session_state.messages:
-        render_message_pro(message)
+    messages = st.session_state.messages
+    hidden = len(messages) - MAX_LIVE_MESSAGES
+    if hidden > 0 and not st.session_state.get('show_older', False):
+        if st.button(f"⬆️ Load {hidden} older messages", key="btn_load_older"):
+            st.session_state.show_older = True
+            st.rerun()
+        messages = itertools.islice(messages, hidden, None)
+    
+    # One element for the whole visible history instead of one per message
+    history_html = "".join(_message_html(m) for m in messages)
+    if history_html:
+        st.markdown(history_html, unsafe_allow_html=True)
+    
+    # New turns are appended here in place, without rerunning the page
+    chat_area = st.container()
     
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Input Area
     st.markdown('<div class="input-container-pro">', unsafe_allow_html=True)
     
-    col1, col2, col3 = st.columns([7, 1.5, 1.5])
-    
-    with col1:
-        user_input = st.text_input(
-            "Command",
-            placeholder="What would you like me to do?",
-            label_visibility="collapsed",
-            key="user_input"
-        )
-    
-    with col2:
-        send_button = st.button("⚡ SEND", use_container_width=True, type="primary")
-    
-    with col3:
-        clear_button = st.button("🗑️ CLEAR", use_container_width=True)
+    # A form only reruns the script on submit, not on every keystroke
+    with st.form("chat_form", clear_on_submit=True, border=False):
+        col1, col2, col3 = st.columns([7, 1.5, 1.5])
+        
+        with col1:
+            user_input = st.text_input(
+                "Command",
+                placeholder="What would you like me to do?",
+                label_visibility="collapsed",
+                key="user_input"
+            )
+        
+        with col2:
+            send_button = st.form_submit_button("⚡ SEND", use_container_width=True, type="primary")
+        
+        with col3:
+            clear_button = st.form_submit_button("🗑️ CLEAR", use_container_width=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Handle clear
     if clear_button:
-        st.session_state.messages = []
+        st.session_state.messages = _new_history()
         st.rerun()
     
     # Handle send
     if send_button and user_input:
-        timestamp = datetime.now().isoformat()
-        
-        # Add user message
-        st.session_state.messages.append({
+        user_message = {
             "role": "user",
             "content": user_input,
-            "timestamp": timestamp
-        })
-        
-        # Process with your enhanced agent
-        with st.spinner("🤖 Processing..."):
-            result = manager.process_message(user_input, st.session_state.current_session)
-        
-        # Add assistant message
-        st.session_state.messages.append({
-            "role": "assistant",
-            "content": result['response'],
-            "timestamp": result.get('timestamp', timestamp)
-        })
+            "timestamp": time.time()
+        }
+        st.session_state.messages.append(user_message)
         
-        st.rerun()
+        with chat_area:
+            render_message_pro(user_message)
+            
+            # Stream the answer into a placeholder, then swap in the styled bubble
+            placeholder = st.empty()
+            response = placeholder.write_stream(
+                manager.stream_message(user_input, st.session_state.current_session)
+            )
+            
+            assistant_message = {
+                "role": "assistant",
+                "content": response if isinstance(response, str) else "".join(map(str, response)),
+                "timestamp": time.time()
+            }
+            st.session_state.messages.append(assistant_message)
+            placeholder.markdown(_message_html(assistant_message), unsafe_allow_html=True)
 
 
 if __name__ == "__main__":
@@ -3,9 +3,44 @@
 Automatic Tool Chaining and Parallel Execution
 """
 
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, FrozenSet
 import asyncio
+import json
+
+
+def _find_json(text: str):
+    """
+    Return the first balanced {...} object in text, or None
+
+    Single pass; braces inside JSON strings are ignored.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
 
 
 @dataclass
@@ -13,7 +48,7 @@ class ToolNode:
     """Node in the tool dependency graph"""
     name: str
     arguments: Dict[str, Any]
-    dependencies: Set[str]  # Names of tools that must run first
+    dependencies: FrozenSet[str]  # Names of tools that must run first
     can_run_parallel: bool = False
 
 
@@ -53,10 +88,10 @@ class ToolDependencyGraph:
         # Tool execution rules
         self.execution_rules = {
             # Read operations can run in parallel
-            "parallel_safe": {"read_file", "list_directory", "search_files", "git_status", "system_info"},
+            "parallel_safe": frozenset({"read_file", "list_directory", "search_files", "git_status", "system_info"}),
             
             # Write operations must be sequential
-            "sequential_only": {"write_file", "replace_in_file", "git_commit", "run_command"},
+            "sequential_only": frozenset({"write_file", "replace_in_file", "git_commit", "run_command"}),
             
             # Dependencies (tool A requires tool B output)
             "requires": {
@@ -111,21 +146,17 @@ class ToolDependencyGraph:
         try:
             response = llm.generate(prompt)
             
-            import re
-            import json
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group())
-            else:
-                data = json.loads(response)
+            json_text = _find_json(response)
+            data = json.loads(json_text if json_text is not None else response)
             
+            parallel_safe = self.execution_rules["parallel_safe"]
             tool_nodes = []
             for item in data.get("tool_chain", []):
                 node = ToolNode(
                     name=item["tool"],
                     arguments=item["arguments"],
-                    dependencies=set(item.get("dependencies", [])),
-                    can_run_parallel=item["tool"] in self.execution_rules["parallel_safe"]
+                    dependencies=frozenset(item.get("dependencies", [])),
+                    can_run_parallel=item["tool"] in parallel_safe
                 )
                 tool_nodes.append(node)
             
@@ -149,37 +180,45 @@ class ToolDependencyGraph:
             ]
         """
         
+        # Kahn's algorithm, one level per round: a node becomes ready once
+        # every dependency name has been completed by some earlier batch
+        indegree = [len(node.dependencies) for node in tool_nodes]
+        dependents = defaultdict(list)
+        for index, node in enumerate(tool_nodes):
+            for dep in node.dependencies:
+                dependents[dep].append(index)
+        
         batches = []
-        remaining = tool_nodes.copy()
         completed = set()
+        scheduled = 0
+        ready = [index for index, count in enumerate(indegree) if count == 0]
         
-        while remaining:
-            # Find tools with satisfied dependencies
-            ready = [
-                node for node in remaining
-                if node.dependencies.issubset(completed)
-            ]
-            
-            if not ready:
-                print("⚠️  Circular dependency detected!")
-                break
-            
+        while ready:
             # Separate parallel-safe from sequential
-            parallel_batch = [node for node in ready if node.can_run_parallel]
-            sequential_batch = [node for node in ready if not node.can_run_parallel]
+            parallel_batch = [tool_nodes[i] for i in ready if tool_nodes[i].can_run_parallel]
+            sequential_batch = [tool_nodes[i] for i in ready if not tool_nodes[i].can_run_parallel]
             
-            # Add parallel batch
+            # Add parallel batch, then sequential (one at a time)
             if parallel_batch:
                 batches.append(parallel_batch)
-                for node in parallel_batch:
-                    completed.add(node.name)
-                    remaining.remove(node)
+            batches.extend([node] for node in sequential_batch)
+            scheduled += len(ready)
             
-            # Add sequential (one at a time)
-            for node in sequential_batch:
-                batches.append([node])
-                completed.add(node.name)
-                remaining.remove(node)
+            next_ready = []
+            for i in ready:
+                name = tool_nodes[i].name
+                if name in completed:
+                    continue
+                completed.add(name)
+                for j in dependents.pop(name, ()):
+                    indegree[j] -= 1
+                    if indegree[j] == 0:
+                        next_ready.append(j)
+            # Keep the caller's ordering within each level
+            ready = sorted(next_ready)
+        
+        if scheduled < len(tool_nodes):
+            print("⚠️  Circular dependency detected!")
         
         return batches
 
@@ -187,6 +226,10 @@ class ToolDependencyGraph:
 class ParallelExecutor:
     """Execute multiple tools in parallel safely"""
     
+    def __init__(self, max_parallel: int = 8):
+        # Cap on simultaneous MCP calls so a large batch can't flood the server
+        self.max_parallel = max_parallel
+    
     async def execute_batch(
         self,
         mcp_client,
@@ -201,18 +244,29 @@ class ParallelExecutor:
         
         print(f"\n⚡ Executing {len(batch)} tools in parallel...")
         
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        
         async def execute_one(node: ToolNode):
-            try:
-                result = await mcp_client.call_tool(
-                    server=server,
-                    name=node.name,
-                    arguments=node.arguments
-                )
-                return (node.name, result)
-            except Exception as e:
-                return (node.name, {"success": False, "error": str(e)})
+            async with semaphore:
+                try:
+                    result = await mcp_client.call_tool(
+                        server=server,
+                        name=node.name,
+                        arguments=node.arguments
+                    )
+                    return (node.name, result)
+                except Exception as e:
+                    return (node.name, {"success": False, "error": str(e)})
         
-        # Run all in parallel
-        results = await asyncio.gather(*[execute_one(node) for node in batch])
+        # Run in parallel, at most max_parallel at a time; one cancelled
+        # call must not take the rest of the batch down with it
+        results = await asyncio.gather(
+            *[execute_one(node) for node in batch],
+            return_exceptions=True
+        )
         
-        return dict(results)
\ No newline at end of file
+        return dict(
+            (node.name, {"success": False, "error": str(result) or type(result).__name__})
+            if isinstance(result, BaseException) else result
+            for node, result in zip(batch, results)
+        )
\ No newline at end of file
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import itertools
 import os
 import shlex
 import subprocess
+import sys
 import tempfile
 import threading
 import time
-import uuid
 from typing import Optional, Tuple, Dict, Any, List
 
 from state import get_server_state
@@ -18,6 +19,9 @@ from state import get_server_state
 
 DEFAULT_TIMEOUT = 300
 MAX_OUTPUT_SIZE = 10000  # characters
+SCRATCH_DIR_NAME = ".mcp_scratch"  # inline snippets, under the workspace root
+PYTHON_EXECUTABLE = sys.executable
+READ_CHUNK_SIZE = 65536  # characters per pipe read
 
 
 # ============================================================
@@ -26,9 +30,14 @@ MAX_OUTPUT_SIZE = 10000  # characters
 
 def get_workspace_root() -> str:
     state = get_server_state()
-    if not state.workspace_root:
+    root = state.workspace_root
+    if not root:
         return os.getcwd()
-    return os.path.abspath(state.workspace_root)
+    # Resolved once per configured root, not on every path check
+    if root != state._workspace_root_src:
+        state._workspace_root_cache = os.path.abspath(root)
+        state._workspace_root_src = root
+    return state._workspace_root_cache
 
 
 def resolve_workspace_path(path: str) -> str:
@@ -44,15 +53,24 @@ def validate_workspace_path(path: str) -> bool:
     """
     Ensure path stays inside workspace.
     """
-    root = get_workspace_root()
-    path = os.path.abspath(path)
-    return os.path.commonpath([root]) == os.path.commonpath([root, path])
+    # Both sides are absolute and normalized, so a separator-terminated
+    # prefix test matches what commonpath would decide
+    root = os.path.normcase(get_workspace_root())
+    path = os.path.normcase(os.path.abspath(path))
+    if path == root:
+        return True
+    prefix = root if root.endswith(os.sep) else root + os.sep
+    return path.startswith(prefix)
 
 
 # ============================================================
 # COMMAND VALIDATION
 # ============================================================
 
+# Basic dangerous patterns
+DANGEROUS_COMMANDS = frozenset({"rm", "shutdown", "reboot", "mkfs", "dd"})
+
+
 def normalize_command(command: str | List[str]) -> List[str]:
     if isinstance(command, str):
         return shlex.split(command)
@@ -75,9 +93,7 @@ def validate_command(command: List[str]) -> Tuple[bool, str]:
         if base_cmd not in state.allowed_commands:
             return False, f"Command not allowed: {base_cmd}"
 
-    # Basic dangerous patterns
-    dangerous = {"rm", "shutdown", "reboot", "mkfs", "dd"}
-    if base_cmd in dangerous:
+    if base_cmd in DANGEROUS_COMMANDS:
         return False, f"Dangerous command blocked: {base_cmd}"
 
     return True, ""
@@ -93,28 +109,108 @@ def truncate_output(text: str, max_size: int = MAX_OUTPUT_SIZE) -> str:
     return text[:max_size] + "\n... (truncated)"
 
 
+def _drain_stream(stream, keep: int, sink: List[str], errors: List[Exception]) -> None:
+    """
+    Read stream to EOF, keeping only its first `keep` characters.
+    A read failure is recorded in `errors` for the caller to re-raise.
+    """
+    kept = 0
+    try:
+        with stream:
+            while True:
+                chunk = stream.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if kept < keep:
+                    chunk = chunk[:keep - kept]
+                    sink.append(chunk)
+                    kept += len(chunk)
+    except Exception as e:
+        errors.append(e)
+
+
+def communicate_bounded(
+    process: subprocess.Popen,
+    timeout: Optional[float],
+    keep: int = MAX_OUTPUT_SIZE + 1,
+) -> Tuple[str, str, bool]:
+    """
+    Popen.communicate() with bounded memory.
+
+    Both pipes are drained to EOF so the child never blocks on a full
+    pipe, but only the first `keep` characters of each are held. The
+    default keeps one character past MAX_OUTPUT_SIZE so truncate_output
+    still sees that the output ran over. On timeout the process is
+    killed. Returns (stdout, stderr, timed_out); an error from either
+    reader is raised here, as communicate() would have.
+    """
+    stdout_parts: List[str] = []
+    stderr_parts: List[str] = []
+    errors: List[Exception] = []
+    readers = [
+        threading.Thread(target=_drain_stream, args=(process.stdout, keep, stdout_parts, errors), daemon=True),
+        threading.Thread(target=_drain_stream, args=(process.stderr, keep, stderr_parts, errors), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    timed_out = False
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        process.kill()
+        process.wait()
+
+    for reader in readers:
+        reader.join()
+
+    if errors:
+        raise errors[0]
+
+    return "".join(stdout_parts), "".join(stderr_parts), timed_out
+
+
 # ============================================================
 # PROCESS MANAGEMENT
 # ============================================================
 
-def register_process(pid: int, command: List[str]) -> str:
+# Registry IDs are "p<server pid>-<n>": unique for this server's lifetime
+_process_counter = itertools.count(1)
+_process_counter_lock = threading.Lock()
+
+# Popen handles by registry ID. Kept out of the state entries, which
+# list_processes returns to clients as plain data.
+_process_handles: Dict[str, subprocess.Popen] = {}
+
+
+def register_process(
+    pid: int,
+    command: List[str],
+    handle: Optional[subprocess.Popen] = None,
+) -> str:
     """
     Register running process in server state.
     """
     state = get_server_state()
-    process_id = str(uuid.uuid4())
+    with _process_counter_lock:
+        n = next(_process_counter)
+    process_id = f"p{os.getpid()}-{n}"
 
     state.register_process(process_id, {
         "pid": pid,
         "command": command,
         "start_time": time.time(),
     })
+    if handle is not None:
+        _process_handles[process_id] = handle
 
     return process_id
 
 
 def remove_process(process_id: str) -> None:
     state = get_server_state()
+    _process_handles.pop(process_id, None)
     state.remove_process(process_id)
 
 
@@ -126,8 +222,14 @@ def kill_process(process_id: str) -> bool:
         return False
 
     try:
-        os.kill(proc["pid"], 9)
-        state.remove_process(process_id)
+        handle = _process_handles.get(process_id)
+        if handle is not None:
+            # Popen knows if it already reaped the child, so a recycled
+            # PID can't be hit; on Windows this is TerminateProcess
+            handle.kill()
+        else:
+            os.kill(proc["pid"], 9)
+        remove_process(process_id)
         return True
     except Exception:
         return False
@@ -185,17 +287,17 @@ def execute_command(
             stdin=subprocess.DEVNULL,
             cwd=cwd,
             text=True,
+            errors="replace",  # undecodable output shows as U+FFFD, not a crash
+            bufsize=-1,  # fully buffered pipes: page-sized reads, not per-line
         )
 
 
 
-        process_id = register_process(process.pid, cmd_list)
+        process_id = register_process(process.pid, cmd_list, process)
 
-        try:
-            stdout, stderr = process.communicate(timeout=timeout)
-        except subprocess.TimeoutExpired:
-            process.kill()
-            stdout, stderr = process.communicate()
+        stdout, stderr, timed_out = communicate_bounded(process, timeout)
+
+        if timed_out:
             remove_process(process_id)
 
             output = (stdout or "") + (stderr or "")
@@ -254,8 +356,7 @@ def run_python_file(file_path: str, args: Optional[List[str]] = None) -> Dict[st
     if not validate_workspace_path(path):
         return {"success": False, "error": "Invalid path"}
 
-    import sys
-    command = [sys.executable, path]
+    command = [PYTHON_EXECUTABLE, path]
 
     if args:
         command.extend(args)
@@ -266,24 +367,30 @@ def run_python_file(file_path: str, args: Optional[List[str]] = None) -> Dict[st
 def run_python_code(code: str) -> Dict[str, Any]:
     """
     Execute inline Python safely using a temp file.
+
+    The file lives in the workspace's scratch dir and is removed after
+    the run. The dir itself stays: concurrent calls may be using it.
     """
+    scratch = os.path.join(get_workspace_root(), SCRATCH_DIR_NAME)
+    os.makedirs(scratch, exist_ok=True)
+
     with tempfile.NamedTemporaryFile(
         mode="w",
+        encoding="utf-8",
         suffix=".py",
         delete=False,
-        dir=get_workspace_root(),
+        dir=scratch,
     ) as f:
         f.write(code)
         temp_path = f.name
 
-    result = run_python_file(temp_path)
-
     try:
-        os.remove(temp_path)
-    except Exception:
-        pass
-
-    return result
+        return run_python_file(temp_path)
+    finally:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
 
 
 # ============================================================
@@ -310,7 +417,14 @@ def run_shell_script(script_path: str) -> Dict[str, Any]:
 
 def get_command_history(limit: int = 50) -> List[Dict[str, Any]]:
     state = get_server_state()
-    return state.global_command_history[-limit:]
+    history = state.global_command_history
+    if limit <= 0:
+        # Same as the old list[-limit:] slice: 0 means everything
+        return list(history)[-limit:]
+    # Walk back from the newest entry instead of copying the whole deque
+    tail = list(itertools.islice(reversed(history), limit))
+    tail.reverse()
+    return tail
 
 
 def clear_command_history() -> None:
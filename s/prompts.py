@@ -219,7 +219,12 @@ _PROMPT_NAMES = [
     "terminal_response_style_prompt",
 ]
 
-state = get_server_state()
 
-for name in _PROMPT_NAMES:
-    state.register_prompt(name)
+def register_prompts() -> None:
+    """
+    Record the prompt names in server state.
+    Called from the server's startup path, not at import time.
+    """
+    state = get_server_state()
+    for name in _PROMPT_NAMES:
+        state.register_prompt(name)
@@ -12,6 +12,8 @@ import sys
 import time
 import json
 import ast
+import importlib
+import importlib.util
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 from datetime import datetime  # FIXED: Added missing import
@@ -20,13 +22,22 @@ from mcp_instance import mcp
 from state import get_server_state
 from helper import resolve_workspace_path
 from tools import _tool_metrics,_resource_cache
-# Import psutil with error handling
-try:
-    import psutil
-    PSUTIL_AVAILABLE = True
-except ImportError:
-    PSUTIL_AVAILABLE = False
-    psutil = None
+# psutil is only needed by the monitor:// resources: check that it is
+# installed here, but defer the import itself to first use
+PSUTIL_AVAILABLE = importlib.util.find_spec("psutil") is not None
+
+
+class _LazyPsutil:
+    """Stand-in that imports psutil on first attribute access"""
+
+    def __getattr__(self, attr):
+        module = importlib.import_module("psutil")
+        # Swap the real module in so later lookups skip this proxy
+        globals()["psutil"] = module
+        return getattr(module, attr)
+
+
+psutil = _LazyPsutil() if PSUTIL_AVAILABLE else None
 
 
 # ============================================================
@@ -60,6 +60,7 @@ def print_registration_summary():
 
 def main():
     server_state.mark_starting()
+    prompts.register_prompts()
 
     try:
         server_state.mark_running()
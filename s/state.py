@@ -3,9 +3,10 @@ from __future__ import annotations
 import threading
 import uuid
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, Any, Optional, List, Set
+from typing import Dict, Any, Optional, List, Set, FrozenSet, Iterable, Deque
 
 
 # ============================================================
@@ -75,8 +76,8 @@ class SessionState:
     # Tool usage stats
     tools_called: Dict[str, int] = field(default_factory=dict)
 
-    # Command history (per session)
-    command_history: List[Dict[str, Any]] = field(default_factory=list)
+    # Command history (per session), last 100 commands only
+    command_history: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=100))
 
     # Running services (FastAPI, Streamlit, etc.)
     active_services: Dict[str, Dict[str, Any]] = field(default_factory=dict)
@@ -97,9 +98,6 @@ class SessionState:
             "status": status,
             "output": output[:1000] if output else None,
         })
-        # keep last 100 commands only
-        if len(self.command_history) > 100:
-            self.command_history.pop(0)
 
 
 # ============================================================
@@ -146,8 +144,8 @@ class MCPServerState:
         self.active_request_count: int = 0
         self.max_parallel_requests_seen: int = 0
 
-        # Global command history
-        self.global_command_history: List[Dict[str, Any]] = []
+        # Global command history, oldest entries fall off the left
+        self.global_command_history: Deque[Dict[str, Any]] = deque(maxlen=500)
 
         # Running processes started by server
         self.running_processes: Dict[str, Dict[str, Any]] = {}
@@ -161,9 +159,12 @@ class MCPServerState:
         # -----------------------------
         # Security / limits
         # -----------------------------
-        self.allowed_commands: Set[str] = set()
+        self.allowed_commands = frozenset()
         self.restricted_paths: Set[str] = set()
         self.workspace_root: Optional[str] = None
+        # Absolute form of workspace_root, and the value it was derived from
+        self._workspace_root_src: Optional[str] = None
+        self._workspace_root_cache: Optional[str] = None
         self.max_command_timeout: int = 600
         self.max_file_size_mb: int = 50
 
@@ -179,6 +180,19 @@ class MCPServerState:
         self.shutdown_requested: bool = False
         self.crashed: bool = False
 
+    # ========================================================
+    # SECURITY SETTINGS
+    # ========================================================
+
+    @property
+    def allowed_commands(self) -> FrozenSet[str]:
+        return self._allowed_commands
+
+    @allowed_commands.setter
+    def allowed_commands(self, commands: Iterable[str]) -> None:
+        # Frozen once here so every validate_command check is a hash lookup
+        self._allowed_commands = frozenset(commands)
+
     # ========================================================
     # LIFECYCLE CONTROL
     # ========================================================
@@ -324,8 +338,6 @@ class MCPServerState:
         }
         with self._lock:
             self.global_command_history.append(entry)
-            if len(self.global_command_history) > 500:
-                self.global_command_history.pop(0)
 
     def register_process(self, pid: str, info: Dict[str, Any]) -> None:
         with self._lock:
@@ -0,0 +1,106 @@
+# test_helper.py
+"""
+Tests for the server's command execution helpers (s/helper.py)
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "s"))
+
+import helper
+
+
+# Writes bytes that are not valid UTF-8 to stdout, then a marker to stderr
+INVALID_UTF8_SCRIPT = (
+    "import sys;"
+    "sys.stdout.buffer.write(b'ok \\xff\\xfe bad\\n');"
+    "sys.stdout.flush();"
+    "sys.stderr.write('done\\n')"
+)
+
+
+def test_execute_command_replaces_invalid_utf8():
+    """Undecodable output is replaced, not lost"""
+    result = helper.execute_command([sys.executable, "-c", INVALID_UTF8_SCRIPT])
+
+    assert result["success"] is True
+    assert "�" in result["output"]
+    assert result["output"].startswith("ok ")
+    assert result["output"].endswith("done\n")
+
+
+def test_communicate_bounded_reraises_reader_errors():
+    """A reader failure surfaces to the caller instead of dying in its thread"""
+    process = subprocess.Popen(
+        [sys.executable, "-c", INVALID_UTF8_SCRIPT],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        stdin=subprocess.DEVNULL,
+        text=True,
+        encoding="utf-8",
+        errors="strict",
+    )
+
+    try:
+        helper.communicate_bounded(process, timeout=30)
+    except UnicodeDecodeError:
+        pass
+    else:
+        raise AssertionError("UnicodeDecodeError was not raised")
+
+
+def test_run_python_code_removes_snippet_files():
+    """Inline snippets run from a scratch file that is removed afterwards"""
+    state = helper.get_server_state()
+    previous_root = state.workspace_root
+    with tempfile.TemporaryDirectory() as workspace:
+        state.workspace_root = workspace
+        try:
+            first = helper.run_python_code("print('first')")
+            second = helper.run_python_code("print('second')")
+        finally:
+            state.workspace_root = previous_root
+
+        assert first["output"] == "first\n"
+        assert second["output"] == "second\n"
+        assert os.listdir(workspace) == [helper.SCRATCH_DIR_NAME]
+        assert os.listdir(os.path.join(workspace, helper.SCRATCH_DIR_NAME)) == []
+
+
+def test_run_python_code_concurrent_calls():
+    """Parallel snippets never find the scratch dir pulled out from under them"""
+    state = helper.get_server_state()
+    previous_root = state.workspace_root
+    results = []
+    with tempfile.TemporaryDirectory() as workspace:
+        state.workspace_root = workspace
+        try:
+            threads = [
+                threading.Thread(target=lambda i=i: results.append(
+                    helper.run_python_code(f"print({i})")))
+                for i in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            state.workspace_root = previous_root
+
+    assert len(results) == 8
+    assert all(result["success"] for result in results)
+
+
+if __name__ == "__main__":
+    for test in (
+        test_execute_command_replaces_invalid_utf8,
+        test_communicate_bounded_reraises_reader_errors,
+        test_run_python_code_removes_snippet_files,
+        test_run_python_code_concurrent_calls,
+    ):
+        test()
+        print(f"✓ {test.__name__}")